@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+여러 현장(단지)을 동시에 처리하는 배치 실행기
+
+- 작업 목록(JSON)의 현장마다 별도 프로세스에서 video_excel_processor 커맨드라인 처리를 실행
+  (한 현장이 실패하거나 비정상 종료되어도 다른 현장은 계속 진행)
+- 전체 CPU 코어 수와 메모리 예산 안에서 동시에 실행할 현장 수를 정함
+- 현장별/전체 진행률을 주기적으로 출력하고, 현장마다 결과 엑셀 하나와 로그/보고서를 남김
+
+작업 목록 예:
+    {
+      "defaults": {"template": "templates/sample.xlsx", "incremental": true},
+      "jobs": [
+        {"name": "A단지", "folders": ["sites/a"]},
+        {"name": "B단지", "folders": ["sites/b"], "workers": 4, "output": "out/b.xlsx"}
+      ]
+    }
+상대 경로는 작업 목록 파일 위치를 기준으로 함
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+from processing_events import EVENT_PROGRESS
+from video_excel_processor import build_parser, run_cli, EXIT_OK, EXIT_PARTIAL, EXIT_INPUT, EXIT_INTERRUPTED
+
+# 현장 하나의 예상 메모리 (메인 프로세스 + 캡처 작업자 프로세스당)
+JOB_BASE_MEMORY_MB = 300
+WORKER_MEMORY_MB = 150
+
+# 진행률 출력 간격 (초)
+PROGRESS_INTERVAL = 10
+
+# 작업 설정 키 → 커맨드라인 옵션
+JOB_OPTIONS = {
+    'template': '--template', 'output': '--output', 'workers': '--workers', 'backend': '--backend',
+    'cache_dir': '--cache-dir', 'cache_size_mb': '--cache-size-mb', 'checkpoint_every': '--checkpoint-every',
+    'checkpoint_minutes': '--checkpoint-minutes', 'report': '--report',
+}
+JOB_FLAGS = {'incremental': '--incremental'}
+JOB_LISTS = {'include': '--include', 'exclude': '--exclude'}
+JOB_PATHS = ('template', 'output', 'cache_dir', 'report')
+
+class SiteJob:
+    """현장 하나의 처리 작업"""
+
+    def __init__(self, name, settings):
+        self.name = name
+        self.settings = settings
+        self.workers = int(settings.get('workers', 1))
+        self.memory_mb = int(settings.get('memory_mb', JOB_BASE_MEMORY_MB + WORKER_MEMORY_MB * self.workers))
+        self.output = settings['output']
+        self.log_file = os.path.splitext(self.output)[0] + '.log'
+        self.process = None
+        self.started = None
+        self.finished = None
+        self.done = 0
+        self.total = 0
+        self.exit_code = None
+        self.error = None
+
+    def argv(self):
+        """커맨드라인 인자 목록"""
+        argv = list(self.settings.get('folders', []))
+        for key, option in JOB_OPTIONS.items():
+            if self.settings.get(key) is not None:
+                argv += [option, str(self.settings[key])]
+        for key, option in JOB_FLAGS.items():
+            if self.settings.get(key):
+                argv.append(option)
+        for key, option in JOB_LISTS.items():
+            for pattern in self.settings.get(key) or []:
+                argv += [option, pattern]
+        return argv
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+def run_site(name, argv, log_file, events):
+    """작업자 프로세스: 현장 하나 처리 (출력은 현장 로그 파일로)"""
+    def report_progress(event):
+        # 진행률 이벤트는 처리기에서 이미 간격이 조절되어 옴
+        if event.type == EVENT_PROGRESS:
+            events.put(('progress', name, event.done, event.total))
+
+    exit_code = EXIT_INPUT
+    error = None
+    try:
+        with open(log_file, 'w', encoding='utf-8') as log:
+            sys.stdout = sys.stderr = log
+            try:
+                exit_code = run_cli(build_parser().parse_args(argv), observer=report_progress)
+            except KeyboardInterrupt:
+                exit_code = EXIT_INTERRUPTED
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"처리 중 오류 발생: {error}")
+            finally:
+                sys.stdout = sys.__stdout__
+                sys.stderr = sys.__stderr__
+    except OSError as e:
+        error = f"로그 파일을 열 수 없습니다: {e}"
+    events.put(('done', name, exit_code, error))
+
+def available_memory_mb():
+    """사용 가능한 메모리 (MB, 알 수 없으면 None)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def load_jobs(job_file, cpu_budget):
+    """작업 목록 파일 읽기 (설정 오류는 ValueError)"""
+    with open(job_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {'jobs': data}
+    defaults = data.get('defaults', {})
+    entries = data.get('jobs', [])
+    if not entries:
+        raise ValueError("작업 목록이 비어 있습니다.")
+
+    base_dir = os.path.dirname(os.path.abspath(job_file))
+    def resolve(path):
+        return os.path.normpath(os.path.join(base_dir, os.path.expanduser(path)))
+
+    # 작업자 수를 지정하지 않은 현장은 코어를 현장 수만큼 나눠 씀
+    default_workers = max(1, cpu_budget // min(len(entries), cpu_budget))
+
+    jobs = []
+    names = set()
+    outputs = set()
+    for number, entry in enumerate(entries, 1):
+        settings = dict(defaults)
+        settings.update(entry)
+        name = str(settings.pop('name', None) or f"job{number}")
+        if name in names:
+            raise ValueError(f"현장 이름이 중복되었습니다: {name}")
+        names.add(name)
+
+        if not settings.get('folders'):
+            raise ValueError(f"[{name}] 작업 폴더(folders)가 없습니다.")
+        settings['folders'] = [resolve(folder) for folder in settings['folders']]
+        for key in JOB_PATHS:
+            if settings.get(key):
+                settings[key] = resolve(settings[key])
+        settings.setdefault('template', resolve('sample.xlsx'))
+        settings['workers'] = min(int(settings.get('workers', default_workers)), cpu_budget)
+
+        # 결과 파일은 기본적으로 첫 번째 작업 폴더에 (템플릿을 같이 써도 겹치지 않게)
+        if not settings.get('output'):
+            template_name = os.path.basename(settings['template'])
+            settings['output'] = os.path.join(settings['folders'][0],
+                                              template_name.replace('.xlsx', '_processed.xlsx'))
+        if os.path.normcase(settings['output']) in outputs:
+            raise ValueError(f"[{name}] 결과 파일이 다른 현장과 겹칩니다: {settings['output']}")
+        outputs.add(os.path.normcase(settings['output']))
+        settings.setdefault('report', os.path.splitext(settings['output'])[0] + '.report.json')
+
+        job = SiteJob(name, settings)
+        # 인자 검사 (잘못된 설정은 실행 전에 알림)
+        try:
+            build_parser().parse_args(job.argv())
+        except SystemExit:
+            raise ValueError(f"[{name}] 잘못된 작업 설정입니다: {json.dumps(entry, ensure_ascii=False)}")
+        jobs.append(job)
+    return jobs
+
+class BatchRunner:
+    """CPU/메모리 예산 안에서 현장 작업들을 동시에 실행"""
+
+    def __init__(self, jobs, cpu_budget, memory_budget_mb=None, progress_interval=PROGRESS_INTERVAL):
+        self.jobs = jobs
+        self.cpu_budget = cpu_budget
+        self.memory_budget_mb = memory_budget_mb
+        self.progress_interval = progress_interval
+        self.events = multiprocessing.Queue()
+        self.pending = list(jobs)
+        self.running = {}
+        self.started = None
+        self.last_progress_state = None  # 마지막으로 출력한 진행 상황 (바뀌지 않았으면 다시 출력하지 않음)
+
+    def can_start(self, job):
+        """예산 안에서 시작할 수 있는지 (실행 중인 작업이 없으면 항상 시작)"""
+        if not self.running:
+            return True
+        cpu_used = sum(running.workers for running in self.running.values())
+        if cpu_used + job.workers > self.cpu_budget:
+            return False
+        if self.memory_budget_mb:
+            memory_used = sum(running.memory_mb for running in self.running.values())
+            if memory_used + job.memory_mb > self.memory_budget_mb:
+                return False
+        return True
+
+    def start_jobs(self):
+        """대기 중인 작업을 순서대로 예산이 허용하는 만큼 시작"""
+        while self.pending and self.can_start(self.pending[0]):
+            job = self.pending.pop(0)
+            # 결과 폴더를 만들기 전에 검사 (기본 결과 위치가 작업 폴더라서 없는 폴더가 생기지 않게)
+            missing = [folder for folder in job.settings['folders'] if not os.path.isdir(folder)]
+            if missing:
+                job.started = time.monotonic()
+                self.finish_job(job, EXIT_INPUT, f"작업 폴더를 찾을 수 없습니다: {', '.join(missing)}")
+                continue
+            os.makedirs(os.path.dirname(job.output) or '.', exist_ok=True)
+            job.process = multiprocessing.Process(target=run_site, name=f"site-{job.name}",
+                                                  args=(job.name, job.argv(), job.log_file, self.events))
+            job.started = time.monotonic()
+            job.process.start()
+            self.running[job.name] = job
+            print(f"[{job.name}] 시작 (작업자 {job.workers}개, 로그 {job.log_file})")
+
+    def finish_job(self, job, exit_code, error=None):
+        job.finished = time.monotonic()
+        job.exit_code = exit_code
+        job.error = error
+        self.running.pop(job.name, None)
+        status = '완료' if exit_code == EXIT_OK else f"종료 코드 {exit_code}"
+        print(f"[{job.name}] {status} ({job.done}/{job.total}, {job.elapsed:.0f}초)"
+              + (f" - {error}" if error else ''))
+
+    def handle_event(self, event):
+        kind, name = event[:2]
+        job = self.running.get(name)
+        if job is None:
+            return
+        if kind == 'progress':
+            job.done, job.total = event[2], event[3]
+        elif kind == 'done':
+            job.process.join()
+            self.finish_job(job, event[2], event[3])
+
+    def check_crashed(self):
+        """완료 알림 없이 끝난 작업자 프로세스 처리 (비정상 종료)"""
+        for job in list(self.running.values()):
+            if not job.process.is_alive():
+                # 종료 직전에 보낸 완료 알림이 아직 큐에 남아 있을 수 있음
+                # (다른 현장의 알림이 계속 와도 0.5초까지만 기다림)
+                deadline = time.monotonic() + 0.5
+                try:
+                    while job.name in self.running and time.monotonic() < deadline:
+                        self.handle_event(self.events.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    pass
+                if job.name in self.running:
+                    self.finish_job(job, EXIT_INPUT, f"작업자 프로세스 비정상 종료 (exitcode {job.process.exitcode})")
+
+    def print_progress(self):
+        """전체 진행 상황 출력 (마지막 출력 이후 바뀐 것이 없으면 생략)"""
+        done = sum(job.done for job in self.jobs)
+        total = sum(job.total for job in self.jobs)
+        finished = sum(1 for job in self.jobs if job.exit_code is not None)
+        state = (done, total, finished, tuple(self.running))
+        if state == self.last_progress_state:
+            return
+        self.last_progress_state = state
+        elapsed = time.monotonic() - self.started
+        rate = done / elapsed if elapsed else 0
+        running = ', '.join(f"{job.name} {job.done}/{job.total}" for job in self.running.values())
+        percent = f" ({done / total * 100:.0f}%)" if total else ''
+        print(f"[현장 {finished}/{len(self.jobs)} 완료] 전체 {done}/{total}{percent}, {rate:.1f} 파일/초"
+              + (f" | 진행 중: {running}" if running else ''))
+
+    def run(self):
+        """모든 작업 실행 (모두 끝나면 반환)"""
+        self.started = time.monotonic()
+        last_progress = self.started
+        try:
+            while self.pending or self.running:
+                self.start_jobs()
+                try:
+                    self.handle_event(self.events.get(timeout=1))
+                except queue.Empty:
+                    pass
+                # 다른 현장이 계속 진행 알림을 보내는 동안에도 비정상 종료된 현장의 예산을 바로 돌려받음
+                self.check_crashed()
+                if time.monotonic() - last_progress >= self.progress_interval:
+                    self.print_progress()
+                    last_progress = time.monotonic()
+        except KeyboardInterrupt:
+            # 실행 중인 현장은 체크포인트를 저장하고 끝날 때까지 기다림 (Ctrl+C는 작업자에게도 전달됨)
+            print("배치 중단: 실행 중인 현장의 중간 결과를 저장하는 중입니다...")
+            self.pending.clear()
+            for job in list(self.running.values()):
+                job.process.join()
+            self.check_crashed()
+            raise
+        self.print_progress()
+
+    def summary(self):
+        """현장별 결과 (JSON 요약용)"""
+        return [{'name': job.name, 'output': job.output, 'log': job.log_file, 'exit_code': job.exit_code,
+                 'error': job.error, 'done': job.done, 'total': job.total, 'seconds': round(job.elapsed, 1)}
+                for job in self.jobs]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 현장 동시 처리 (동영상/이미지 → 엑셀)")
+    parser.add_argument('job_file', help="작업 목록 JSON 파일")
+    parser.add_argument('--cpus', type=int, default=os.cpu_count() or 1,
+                        help="동시에 쓸 CPU 코어 수 (현장별 작업자 수 합계 상한, 기본값: 전체 코어)")
+    parser.add_argument('--memory-mb', type=int,
+                        help="동시에 실행할 현장들의 예상 메모리 합계 상한 (기본값: 사용 가능한 메모리의 80%%)")
+    parser.add_argument('--progress-seconds', type=float, default=PROGRESS_INTERVAL,
+                        help="진행률 출력 간격 (초)")
+    parser.add_argument('--summary', help="현장별 결과를 기록할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    cpu_budget = max(1, args.cpus)
+    memory_budget = args.memory_mb
+    if memory_budget is None:
+        available = available_memory_mb()
+        memory_budget = int(available * 0.8) if available else None
+
+    try:
+        jobs = load_jobs(args.job_file, cpu_budget)
+    except (OSError, ValueError) as e:
+        print(f"작업 목록을 읽을 수 없습니다: {e}", file=sys.stderr)
+        return EXIT_INPUT
+
+    print(f"현장 {len(jobs)}개 처리 시작 (CPU {cpu_budget}개"
+          + (f", 메모리 {memory_budget}MB)" if memory_budget else ")"))
+    runner = BatchRunner(jobs, cpu_budget, memory_budget, args.progress_seconds)
+    interrupted = False
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        interrupted = True
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(runner.summary(), f, ensure_ascii=False, indent=1)
+
+    failed = [job for job in jobs if job.exit_code != EXIT_OK]
+    for job in failed:
+        print(f"실패/미완료: {job.name} (종료 코드 {job.exit_code}, 로그 {job.log_file})", file=sys.stderr)
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VideoExcelProcessor 단계별 벤치마크
+
+- 가상 현장(synthetic_site.py)을 파일 10/100/1000개 규모로 만들고 실제 처리 경로(process_all)로 처리하며
+  ProcessingStats의 단계별 시간을 기록 (템플릿 읽기, 스캔, 헤더 확인, 디코딩, 썸네일 변환, 행 찾기, 이미지 삽입, 저장)
+- 규모마다 작업자 1개와 여러 개(기본값: 코어 수, 2~4개)로 각각 별도 프로세스에서 실행해 처리량, 최대 메모리
+  (메인 프로세스와 작업자 프로세스)를 측정하고 작업자 1개 대비 속도 향상을 출력
+- baselines.json과 비교해 허용 범위를 넘게 느려지거나 메모리를 더 쓰면 종료 코드 1
+- 모듈 import 시간 예산: GUI/처리기/배치 모듈을 새 프로세스에서 import해 예산을 넘거나
+  무거운 패키지(cv2, openpyxl, PIL 등)를 import 시점에 불러오면 종료 코드 1
+- 컬럼 배치 확인: 위치사진 컬럼이 없는 템플릿에서도 캡처 프레임이 제 컬럼에 들어가지 않으면 종료 코드 1
+
+사용 예:
+    python benchmarks/run_benchmarks.py                      # 기준값과 비교
+    python benchmarks/run_benchmarks.py --sizes 10 100       # 일부 규모만
+    python benchmarks/run_benchmarks.py --workers 1 2 8      # 작업자 수 지정
+    python benchmarks/run_benchmarks.py --update-baselines   # 현재 결과를 기준값으로 저장
+    python benchmarks/run_benchmarks.py --sizes              # import 시간만 확인
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from processing_stats import STAGES
+from synthetic_site import make_site, TEMPLATE_HEADERS
+
+BASELINES_FILE = os.path.join(BENCHMARK_DIR, 'baselines.json')
+DEFAULT_SIZES = (10, 100, 1000)
+# 측정할 작업자 수 (작업자 스레드 1개 + 프로세스 풀, 코어가 하나여도 프로세스 풀 경로를 측정하도록 최소 2개)
+DEFAULT_WORKERS = [1, max(2, min(4, os.cpu_count() or 1))]
+DEFAULT_TOLERANCE = 0.3  # 기준값 대비 30%까지는 측정 오차로 봄
+MIN_STAGE_SECONDS = 0.05  # 이보다 짧은 단계는 비교하지 않음
+
+
+# import 시간 예산 (GUI 창과 커맨드라인이 바로 시작되도록 무거운 패키지는 처음 사용할 때 불러옴)
+IMPORT_MODULES = ('video_excel_processor', 'video_excel_gui', 'batch_runner')
+HEAVY_MODULES = ('cv2', 'numpy', 'pandas', 'openpyxl', 'PIL', 'psutil', 'win32gui', 'win32process')
+DEFAULT_IMPORT_BUDGET = 0.3  # 초 (인터프리터 시작 시간 제외)
+IMPORT_REPEATS = 5  # 가장 빠른 값을 사용 (디스크 캐시 등 측정 잡음 제외)
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - started,
+                  'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def peak_memory_mb(children=False):
+    """현재 프로세스(children이면 끝난 자식 프로세스 중 가장 큰 것)의 최대 메모리 사용량 (MB, 모르면 None)"""
+    try:
+        import resource
+    except ImportError:
+        if children:
+            return None
+        # Windows: 최대 작업 집합 크기
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def measure_import(module):
+    """새 프로세스에서 모듈 import 시간과 함께 불러온 무거운 패키지 측정 (import할 수 없으면 None)"""
+    best = None
+    for _ in range(IMPORT_REPEATS):
+        completed = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=os.path.dirname(BENCHMARK_DIR), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8')
+        if completed.returncode != 0:
+            return None
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+def check_imports(budget):
+    """모듈별 import 시간을 출력하고 예산 초과/무거운 패키지 로드 항목 반환"""
+    print("=== 모듈 import 시간 ===")
+    regressions = []
+    for module in IMPORT_MODULES:
+        result = measure_import(module)
+        if result is None:
+            # tkinter가 없는 환경 등
+            print(f"  {module:<22}  import 불가 (건너뜀)")
+            continue
+        line = f"  {module:<22}{result['seconds']:>7.3f}초"
+        if result['heavy']:
+            line += f"  (import 시 로드: {', '.join(result['heavy'])})"
+            regressions.append(f"{module} import 시 무거운 패키지 로드: {', '.join(result['heavy'])}")
+        if result['seconds'] > budget:
+            regressions.append(f"{module} import 시간: {result['seconds']:.3f}초 > 예산 {budget:.3f}초")
+        print(line)
+    return regressions
+
+def check_column_layout():
+    """템플릿에 위치사진 컬럼이 없어도 점검사진1/2에 중간/끝 프레임이 들어가는지 확인 (문제 항목 반환)"""
+    from openpyxl import Workbook
+    from PIL import Image
+    from video_excel_processor import HEADER_ROW, VideoExcelProcessor, make_thumbnail
+
+    print("=== 컬럼 배치 확인 ===")
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = '입상sample'
+    headers = [header for header in TEMPLATE_HEADERS['입상sample'] if header != '위치사진']
+    for col, header in enumerate(headers, 1):
+        worksheet.cell(HEADER_ROW, col).value = header
+
+    # 시작/중간/끝 프레임 대신 색이 다른 썸네일
+    frames = dict(zip(('시작', '중간', '끝'),
+                      (make_thumbnail(Image.new('RGB', (64, 48), color)) for color in ('red', 'green', 'blue'))))
+    processor = VideoExcelProcessor('layout.xlsx', None, observers=[])
+    processor.insert_video_images(worksheet, '입상', list(frames.values()), HEADER_ROW + 1)
+
+    placed = {image.anchor: image._data() for image in worksheet._images}
+    regressions = []
+    for header, frame in (('점검사진1', '중간'), ('점검사진2', '끝')):
+        cell = worksheet.cell(HEADER_ROW + 1, headers.index(header) + 1).coordinate
+        if placed.get(cell) != frames[frame]:
+            regressions.append(f"위치사진 컬럼이 없는 템플릿: {header}에 {frame} 프레임이 들어가지 않음")
+    if len(placed) != 2:
+        regressions.append(f"위치사진 컬럼이 없는 템플릿: 이미지 {len(placed)}개 삽입 (2개여야 함)")
+    print("  위치사진 컬럼 없음: " + ("이상 있음" if regressions else "정상"))
+    return regressions
+
+def run_pipeline(site_root, output_file, backend, workers=1):
+    """가상 현장 하나를 실제 처리 경로(VideoExcelProcessor.process_all)로 처리하고 단계별 시간 측정
+    
+    작업자(iter_media), 처리 순서 예측, 썸네일 캐시(빈 캐시 폴더에서 시작), 저장까지 커맨드라인 실행과 같은 코드를 거침
+    작업자가 여러 개면 디코딩/썸네일 변환 단계 시간은 작업자 시간의 합계라서 전체 시간보다 클 수 있음
+    """
+    import shutil
+    from video_excel_processor import VideoExcelProcessor
+
+    cache_dir = output_file + '.cache'
+    for path in (output_file, output_file.replace('.xlsx', '.manifest.json')):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    processor = VideoExcelProcessor(os.path.join(site_root, 'sample.xlsx'), None, output_file=output_file,
+                                    workers=workers, output_backend=backend, cache_dir=cache_dir, observers=[],
+                                    roots=[os.path.join(site_root, '입상관'), os.path.join(site_root, '횡주관')])
+    stats = processor.process_all()
+    if stats is None or not processor.saved:
+        raise RuntimeError(f"처리 실패: {site_root}")
+
+    file_count = sum(len(scan.videos) + sum(len(group) for group in scan.image_groups.values())
+                     for scan in processor.scans.values())
+    worker_peak = peak_memory_mb(children=True)
+    return {
+        'files': file_count,
+        'workers': workers,
+        'stages': {name: round(entry['wall'], 4) for name, entry in stats.stages.items()},
+        'counts': {name: entry['count'] for name, entry in stats.stages.items()},
+        'total': round(stats.wall_time, 4),
+        'files_per_sec': round(file_count / stats.wall_time, 2) if stats.wall_time else 0,
+        'peak_memory_mb': round(peak_memory_mb(), 1),
+        'worker_peak_memory_mb': round(worker_peak, 1) if worker_peak else None,
+        'output_mb': round(os.path.getsize(output_file) / 1024 / 1024, 2),
+    }
+
+def prepare_site(size, work_dir, seed):
+    """가상 현장 준비 (같은 설정으로 만든 현장이 있으면 재사용), 현장 폴더 반환"""
+    site_root = os.path.join(work_dir, f'site_{size}_{seed}')
+    print(f"[{size}] 가상 현장 준비 중: {site_root}")
+    make_site(site_root, size, seed)
+    return site_root
+
+def run_size(site_root, size, work_dir, backend, workers):
+    """준비한 가상 현장을 별도 프로세스에서 측정"""
+    output_file = os.path.join(work_dir, f'output_{size}_w{workers}.xlsx')
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', site_root, output_file, '--backend', backend,
+         '--workers', str(workers)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8')
+    if completed.returncode != 0:
+        raise RuntimeError(f"벤치마크 실행 실패 ({size}개, 작업자 {workers}개):\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def compare(result, baseline, tolerance):
+    """기준값과 비교해 느려진 항목 목록 반환"""
+    label = f"{result['files']}개(작업자 {result['workers']})"
+    regressions = []
+    limit = 1 + tolerance
+    for name in STAGES:
+        current = result['stages'].get(name, 0)
+        base = baseline['stages'].get(name)
+        if base is None or max(current, base) < MIN_STAGE_SECONDS:
+            continue
+        if current > base * limit:
+            regressions.append(f"{label} {name}: {base:.3f}초 → {current:.3f}초")
+    if result['files_per_sec'] * limit < baseline['files_per_sec']:
+        regressions.append(f"{label} 처리량: {baseline['files_per_sec']} → {result['files_per_sec']} 파일/초")
+    if result['peak_memory_mb'] > baseline['peak_memory_mb'] * limit:
+        regressions.append(f"{label} 최대 메모리: {baseline['peak_memory_mb']} → {result['peak_memory_mb']}MB")
+    worker_peak, base_worker_peak = result.get('worker_peak_memory_mb'), baseline.get('worker_peak_memory_mb')
+    if worker_peak and base_worker_peak and worker_peak > base_worker_peak * limit:
+        regressions.append(f"{label} 작업자 최대 메모리: {base_worker_peak} → {worker_peak}MB")
+    return regressions
+
+def print_result(result, baseline):
+    """규모/작업자 수별 결과 표 출력"""
+    print(f"\n=== 파일 {result['files']}개, 작업자 {result['workers']}개 ===")
+    for name in STAGES:
+        line = f"  {name:<11}{result['stages'][name]:>9.3f}초  ({result['counts'][name]}회)"
+        if baseline and name in baseline['stages']:
+            line += f"  기준 {baseline['stages'][name]:.3f}초"
+        print(line)
+    line = (f"  합계 {result['total']:.2f}초, {result['files_per_sec']} 파일/초, "
+            f"최대 메모리 {result['peak_memory_mb']}MB, 결과 {result['output_mb']}MB")
+    if baseline:
+        line += f"  (기준 {baseline['files_per_sec']} 파일/초, {baseline['peak_memory_mb']}MB)"
+    print(line)
+    if result.get('worker_peak_memory_mb') and result['workers'] > 1:
+        print(f"  작업자 프로세스 최대 메모리 {result['worker_peak_memory_mb']}MB")
+
+def load_baselines():
+    try:
+        with open(BASELINES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="동영상/이미지 → 엑셀 처리 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(DEFAULT_SIZES),
+                        help="측정할 파일 수 (기본값: 10 100 1000, 값 없이 주면 import 시간만 확인)")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'video_excel_benchmark'),
+                        help="가상 현장과 결과 파일을 둘 폴더 (만든 현장은 다음 실행에 재사용)")
+    parser.add_argument('--backend', default='openpyxl', help="엑셀 저장 방식")
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS,
+                        help="측정할 작업자 수 (기본값: 1과 코어 수(2~4개))")
+    parser.add_argument('--seed', type=int, default=0, help="가상 현장 난수 시드")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="기준값 대비 허용 비율 (기본값: 0.3)")
+    parser.add_argument('--import-budget', type=float, default=DEFAULT_IMPORT_BUDGET,
+                        help="모듈별 import 시간 상한 (초, 기본값: 0.3)")
+    parser.add_argument('--update-baselines', action='store_true', help="현재 결과를 기준값으로 저장")
+    parser.add_argument('--child', nargs=2, metavar=('SITE', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # 처리기 출력은 버리고 결과 JSON만 출력
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            result = run_pipeline(args.child[0], args.child[1], args.backend, args.workers[0])
+        print(json.dumps(result))
+        return 0
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    baselines = load_baselines()
+    baseline_results = baselines.get('results', {}) if baselines.get('backend', 'openpyxl') == args.backend else {}
+
+    results = {}
+    regressions = check_imports(args.import_budget)
+    regressions.extend(check_column_layout())
+    for size in args.sizes:
+        site_root = prepare_site(size, args.work_dir, args.seed)
+        results[str(size)] = {}
+        for workers in args.workers:
+            result = run_size(site_root, size, args.work_dir, args.backend, workers)
+            baseline = baseline_results.get(str(size), {}).get(str(workers))
+            print_result(result, baseline)
+            results[str(size)][str(workers)] = result
+            if baseline:
+                regressions.extend(compare(result, baseline, args.tolerance))
+        sequential = results[str(size)].get('1')
+        for workers, result in results[str(size)].items():
+            if sequential and workers != '1' and result['total']:
+                print(f"  작업자 {workers}개: 작업자 1개 대비 {sequential['total'] / result['total']:.2f}배")
+
+    if args.update_baselines:
+        for size, by_workers in results.items():
+            baseline_results.setdefault(size, {}).update(by_workers)
+        baselines = {
+            'backend': args.backend,
+            'seed': args.seed,
+            'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                        'processor': platform.processor() or platform.machine()},
+            'results': baseline_results,
+        }
+        with open(BASELINES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=1)
+        print(f"\n기준값 저장: {BASELINES_FILE}")
+        return 0
+
+    if regressions:
+        print("\n기준값보다 느려졌거나 예산을 넘었거나 확인에 실패한 항목:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("\n기준값 대비 성능 저하 없음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
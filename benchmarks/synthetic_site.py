@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 가상 현장 생성기
+
+- 입상sample/횡주sample 시트가 있는 템플릿 엑셀 (헤더는 3번째 행)
+- 입상관/횡주관 폴더에 파일명 패턴이 맞는 점검 동영상 (해상도, 길이, 코덱을 섞어서 생성)
+- 같은 행에 들어가는 이상배관 이미지 1~3장
+- 같은 파일 수와 시드면 항상 같은 현장이 만들어짐
+"""
+
+import argparse
+import json
+import os
+import random
+
+import cv2
+import numpy as np
+from openpyxl import Workbook
+from PIL import Image
+
+# 생성 완료 표시 파일 (같은 설정으로 만든 현장은 다시 만들지 않음)
+SITE_MARKER = 'site.json'
+SITE_VERSION = 1
+
+# 동영상 설정 후보 ((가로, 세로), 가중치)
+VIDEO_RESOLUTIONS = [((320, 240), 60), ((640, 360), 30), ((1280, 720), 9), ((1920, 1080), 1)]
+VIDEO_DURATIONS = (2, 8)  # 초
+VIDEO_FPS = (10, 15, 30)
+
+# 코덱 후보 (MPEG-4 Part 2, H.264), 설치된 OpenCV에서 쓸 수 없으면 mp4v로 대체
+VIDEO_CODECS = ('mp4v', 'avc1')
+FALLBACK_CODEC = 'mp4v'
+_codec_support = {}  # 코덱별 사용 가능 여부 (처음 한 번만 확인)
+
+USAGES = ('세탁', '배수', '오수', '우수')
+ISSUES = ('이물질', '부식', '스케일')
+LOCATIONS = ('옥상', '지하', '1층', '세대내')
+
+# 템플릿 헤더 (3번째 행), 횡주 양식은 라인 상세/점검사진2 헤더가 병합되어 비어 있음
+TEMPLATE_HEADERS = {
+    '입상sample': ['동', '라인', '용도', '배관경', '위치사진', '점검사진1', '점검사진2',
+                  '이상배관사진', '이상유무', '위치'],
+    '횡주sample': ['동', '라인', None, '구분', '관경', '위치사진', '점검사진', None,
+                  '이상배관사진', '이상유무', '위치'],
+}
+
+def make_template(path):
+    """입상sample/횡주sample 시트가 있는 템플릿 엑셀 생성"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, headers in TEMPLATE_HEADERS.items():
+        worksheet = workbook.create_sheet(title)
+        worksheet.cell(1, 1).value = f"{title[:2]} 점검결과"
+        for col, header in enumerate(headers, 1):
+            worksheet.cell(3, col).value = header
+    workbook.save(path)
+
+def open_video_writer(path, codec, fps, size):
+    """지정한 코덱으로 VideoWriter 열기 (쓸 수 없는 코덱이면 대체 코덱 사용)"""
+    for fourcc in (codec, FALLBACK_CODEC):
+        if _codec_support.get(fourcc) is False:
+            continue
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        _codec_support[fourcc] = writer.isOpened()
+        if _codec_support[fourcc]:
+            return writer, fourcc
+        writer.release()
+    raise RuntimeError(f"VideoWriter를 열 수 없습니다: {path}")
+
+def make_video(path, size, seconds, fps, codec):
+    """프레임마다 밝기와 번호가 바뀌는 가상 점검 동영상 생성 (실제 사용한 코덱 반환)"""
+    writer, used_codec = open_video_writer(path, codec, fps, size)
+    width, height = size
+    frame = np.empty((height, width, 3), np.uint8)
+    scale = max(1, width // 320)
+    for index in range(seconds * fps):
+        frame[:] = ((index * 3) % 255, (index * 7) % 255, 128)
+        cv2.putText(frame, str(index), (10 * scale, 60 * scale), cv2.FONT_HERSHEY_SIMPLEX,
+                    2 * scale, (255, 255, 255), 3 * scale)
+        writer.write(frame)
+    writer.release()
+    return used_codec
+
+def make_issue_image(path, rng):
+    """이상배관 사진 대신 쓰는 단색 + 노이즈 JPEG 생성"""
+    width, height = rng.choice([(800, 600), (1600, 1200), (4032, 3024)])
+    base = np.full((height // 8, width // 8, 3), rng.randrange(256), np.uint8)
+    noise = np.random.default_rng(rng.randrange(1 << 30)).integers(0, 64, base.shape, np.uint8)
+    Image.fromarray(base + noise).resize((width, height)).save(path, quality=85)
+
+def iter_row_keys(pipe_type, rng):
+    """겹치지 않는 (동, 호, 용도) 조합을 차례로 생성"""
+    used = set()
+    while True:
+        dong = f"{rng.choice([3, 9, 11, 12])}{rng.randint(1, 20):02d}동"
+        if pipe_type == '입상관':
+            ho = f"{rng.randint(1, 8)}호"
+        else:
+            ho = f"{rng.randint(1, 8)}-{rng.randint(1, 4)}호"
+        key = (dong, ho, rng.choice(USAGES))
+        if key not in used:
+            used.add(key)
+            yield key
+
+def make_site(root, file_count, seed=0):
+    """가상 현장 생성 (동영상과 이미지 합계 file_count개), 생성 정보 반환"""
+    marker_path = os.path.join(root, SITE_MARKER)
+    if os.path.exists(marker_path):
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if info.get('version') == SITE_VERSION and info.get('files') == file_count and info.get('seed') == seed:
+            return info
+
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    make_template(os.path.join(root, 'sample.xlsx'))
+
+    info = {'version': SITE_VERSION, 'files': file_count, 'seed': seed,
+            'videos': 0, 'images': 0, 'video_bytes': 0, 'image_bytes': 0, 'codecs': {}}
+    pipe_folders = ['입상관', '횡주관']
+    row_keys = {}
+    for pipe_folder in pipe_folders:
+        os.makedirs(os.path.join(root, pipe_folder), exist_ok=True)
+        row_keys[pipe_folder] = iter_row_keys(pipe_folder, rng)
+
+    resolutions = [size for size, _ in VIDEO_RESOLUTIONS]
+    weights = [weight for _, weight in VIDEO_RESOLUTIONS]
+    created = 0
+    index = 0
+    while created < file_count:
+        pipe_folder = pipe_folders[index % 2]
+        index += 1
+        dong, ho, usage = next(row_keys[pipe_folder])
+        prefix = os.path.join(root, pipe_folder, f"{dong} {ho} {pipe_folder} {usage}")
+
+        # 행마다 동영상 1개
+        video_path = prefix + '.mp4'
+        codec = make_video(video_path, rng.choices(resolutions, weights)[0], rng.randint(*VIDEO_DURATIONS),
+                           rng.choice(VIDEO_FPS), rng.choice(VIDEO_CODECS))
+        info['codecs'][codec] = info['codecs'].get(codec, 0) + 1
+        info['videos'] += 1
+        info['video_bytes'] += os.path.getsize(video_path)
+        created += 1
+
+        # 행 절반 정도에 이상배관 이미지 1~3장
+        if rng.random() < 0.5:
+            issue = rng.choice(ISSUES)
+            location = rng.choice(LOCATIONS)
+            for number in range(min(rng.randint(1, 3), file_count - created)):
+                image_path = f"{prefix}_{issue}_{location}{number}.jpg"
+                make_issue_image(image_path, rng)
+                info['images'] += 1
+                info['image_bytes'] += os.path.getsize(image_path)
+                created += 1
+
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=1)
+    return info
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 가상 현장 생성")
+    parser.add_argument('root', help="생성할 폴더")
+    parser.add_argument('--files', type=int, default=100, help="동영상 + 이미지 파일 수")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    info = make_site(args.root, args.files, args.seed)
+    print(f"가상 현장 생성 완료: {args.root} (동영상 {info['videos']}개, 이미지 {info['images']}개, "
+          f"코덱 {info['codecs']})")
+
+if __name__ == "__main__":
+    main()
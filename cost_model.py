@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+파일별 처리 시간 예측 (앞으로 기록할 파일 중 오래 걸리는 것부터 작업자에 넘기는 데 사용)
+
+- 작업량: 헤더 정보가 있는 동영상은 길이/fps/키프레임 간격으로 계산한 디코딩 화소 수와 파일 크기(FileJob.cost),
+  그 외에는 파일 크기
+- 예측 시간 = 종류별 속도(작업량 단위당 초) × 작업량
+- 작업자가 측정한 시간이 올 때마다 종류별 속도를 지수 이동 평균으로 보정하고 예측 오차를 기록
+- 속도는 매니페스트에 저장되어 같은 현장을 다시 처리할 때 이어서 사용
+"""
+
+import heapq
+
+# 종류별 기본 속도 (작업량 단위당 초, 측정값으로 보정됨)
+DEFAULT_RATES = {
+    'video_decode': 3e-9,  # 헤더 정보가 있는 동영상: 작업량(디코딩할 화소 수 환산) 단위당
+    'video_size': 5e-7,    # 헤더 정보가 없는 동영상: 파일 바이트당
+    'image': 1e-6,         # 이미지 파일 바이트당
+}
+
+# 새 측정값 반영 비율 (클수록 최근 파일에 빨리 맞춰짐)
+RATE_SMOOTHING = 0.2
+
+class CostModel:
+    """종류별 처리 속도와 예측 오차"""
+
+    def __init__(self, rates=None):
+        self.rates = dict(DEFAULT_RATES)
+        if rates:
+            self.rates.update({key: value for key, value in rates.items() if key in DEFAULT_RATES and value > 0})
+        self.errors = []  # 파일별 상대 오차 (예측 - 측정) / 측정
+
+    @staticmethod
+    def key(kind, job):
+        """속도 종류 ('video_decode', 'video_size', 'image')"""
+        if kind == 'video':
+            return 'video_decode' if job.media_info else 'video_size'
+        return 'image'
+
+    def estimate(self, kind, job):
+        """예상 처리 시간 (초)"""
+        return self.rates[self.key(kind, job)] * max(1, job.cost)
+
+    def observe(self, kind, job, seconds):
+        """측정한 처리 시간으로 속도 보정 (보정 전 예측값 반환)"""
+        estimated = self.estimate(kind, job)
+        if seconds > 0:
+            key = self.key(kind, job)
+            measured_rate = seconds / max(1, job.cost)
+            self.rates[key] += RATE_SMOOTHING * (measured_rate - self.rates[key])
+            self.errors.append((estimated - seconds) / seconds)
+        return estimated
+
+    def summary(self):
+        """예측 오차 요약 문자열"""
+        if not self.errors:
+            return None
+        mean_error = sum(abs(error) for error in self.errors) / len(self.errors)
+        return f"처리 시간 예측: 파일 {len(self.errors)}개, 평균 오차 {mean_error:.0%}"
+
+class DispatchQueue:
+    """아직 작업자에 넘기지 않은 파일 목록
+    
+    엑셀 기록 쪽이 기다리는 파일(head)을 항상 먼저 넘기고, 나머지 자리는 목록 전체에서 예상 처리 시간이
+    긴 파일부터 채움 (목록 끝에 있는 긴 파일도 처음부터 처리되어 마지막에 혼자 남지 않음).
+    같은 속도 종류 안에서는 작업량 순서가 바뀌지 않으므로 종류별 힙 맨 위만 현재 속도로 비교함.
+    """
+
+    def __init__(self, model, tasks):
+        self.model = model
+        self.tasks = tasks  # [(종류, FileJob)]
+        self.taken = [False] * len(tasks)
+        self.remaining = len(tasks)
+        self.first = 0  # 아직 넘기지 않은 가장 앞 파일 위치 (이보다 앞은 모두 넘김)
+        self.heaps = {}  # {속도 종류: [(-작업량, 위치)]}
+        for index, (kind, job) in enumerate(tasks):
+            self.heaps.setdefault(model.key(kind, job), []).append((-max(1, job.cost), index))
+        for heap in self.heaps.values():
+            heapq.heapify(heap)
+
+    def __len__(self):
+        return self.remaining
+
+    def take(self, index):
+        self.taken[index] = True
+        self.remaining -= 1
+        return index
+
+    def pop(self, head, longest_first=True):
+        """다음에 넘길 파일 위치 (head가 남아 있으면 head, 없으면 남은 파일 중 예상 시간이 가장 긴 파일,
+        longest_first가 아니면 head 뒤로 가장 앞 파일, 남은 파일이 없으면 None)"""
+        if not self.remaining:
+            return None
+        if head < len(self.tasks) and not self.taken[head]:
+            return self.take(head)
+        if not longest_first:
+            # head 앞은 이미 기록했으므로 남은 파일은 모두 head 뒤에 있음
+            index = max(self.first, head)
+            while self.taken[index]:
+                index += 1
+            self.first = index
+            return self.take(index)
+        best = None
+        for key, heap in self.heaps.items():
+            while heap and self.taken[heap[0][1]]:
+                heapq.heappop(heap)
+            if heap:
+                # 예상 시간이 같으면 앞 파일 먼저
+                candidate = (self.model.rates[key] * heap[0][0], heap[0][1])
+                if best is None or candidate < best:
+                    best = candidate
+        return self.take(best[1])
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+처리 진행 이벤트와 중지 요청
+
+- VideoExcelProcessor는 print 대신 이벤트를 만들어 등록된 observer(호출 가능한 객체)에 전달
+  (커맨드라인은 print_event로 출력, GUI는 로그 창/진행률 바로 표시, 배치 실행기는 진행률만 사용)
+- 진행률 이벤트는 PROGRESS_EVENT_INTERVAL마다 한 번만 보냄 (첫 번째와 마지막은 항상 보냄)
+- CancelToken: 다른 스레드에서 중지를 요청하면 처리기가 파일 사이마다 확인해 멈춤
+"""
+
+import os
+import threading
+
+# 이벤트 종류
+EVENT_LOG = 'log'                      # 일반 메시지 (message)
+EVENT_WARNING = 'warning'              # 경고/오류 메시지 (message, path)
+EVENT_FILE_STARTED = 'file_started'    # 파일 처리 시작 (kind, path, done, total, count)
+EVENT_FILE_FINISHED = 'file_finished'  # 파일 처리 끝 (kind, path, ok, reason, data=단계별 시간)
+EVENT_PROGRESS = 'progress'            # 진행 수 (done, total)
+EVENT_SUMMARY = 'summary'              # 처리 완료 (data=단계별 처리 시간 보고서 내용)
+
+# 진행률 이벤트 최소 간격 (초)
+PROGRESS_EVENT_INTERVAL = 0.2
+
+# 파일 종류별 이름 (이벤트 kind)
+FILE_KIND_LABELS = {'video': '동영상', 'image': '이미지', 'invalid': '동영상'}
+
+class ProcessingEvent:
+    """처리기가 observer에 전달하는 이벤트"""
+    __slots__ = ('type', 'message', 'path', 'kind', 'done', 'total', 'count', 'ok', 'reason', 'data')
+
+    def __init__(self, event_type, message=None, path=None, kind=None, done=None, total=None, count=None,
+                 ok=None, reason=None, data=None):
+        self.type = event_type
+        self.message = message
+        self.path = path
+        self.kind = kind  # 'video', 'image', 'invalid' (파일명 패턴이 맞지 않는 동영상)
+        self.done = done
+        self.total = total
+        self.count = count  # 이미지 그룹의 파일 수
+        self.ok = ok
+        self.reason = reason  # 실패 사유
+        self.data = data
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[1:]
+                           if getattr(self, name) is not None)
+        return f"ProcessingEvent({self.type!r}, {fields})"
+
+class CancelToken:
+    """처리 중지 요청 (스레드 간 공유)"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+def format_event(event):
+    """커맨드라인 출력용 문자열 (출력하지 않는 이벤트면 None)"""
+    if event.type in (EVENT_LOG, EVENT_WARNING):
+        return event.message
+    name = os.path.basename(event.path) if event.path else ''
+    if event.type == EVENT_FILE_STARTED and event.kind != 'invalid':
+        text = f"[{event.done}/{event.total}] {FILE_KIND_LABELS[event.kind]} 처리 중: {name}"
+        if event.count and event.count > 1:
+            text += f" (총 {event.count}개 중 첫 번째)"
+        return text
+    if event.type == EVENT_FILE_FINISHED and not event.ok:
+        return f"처리 실패: {name} - {event.reason}"
+    return None
+
+def print_event(event):
+    """기본 observer: 이벤트를 표준 출력에 출력"""
+    text = format_event(event)
+    if text is not None:
+        print(text)
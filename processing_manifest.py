@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+처리 결과 매니페스트 (결과 엑셀 옆에 JSON으로 저장)
+
+- 엑셀에 반영된 파일마다 파일 버전(크기, 수정 시각)과 삽입 위치(시트, 행, 컬럼)를 기록
+- 증분 처리 시 새로 추가되었거나 변경된 파일만 골라내는 데 사용
+- 중간 저장(체크포인트) 시 작업 식별 토큰과 완료 여부를 함께 기록해 중단된 작업을 이어서 처리
+- 파일 종류별 처리 속도(처리 시간 예측값)도 함께 보관
+"""
+
+import json
+import os
+
+class ProcessingManifest:
+    """처리된 파일 목록과 엑셀 삽입 위치"""
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path))  # 파일 키의 기준 폴더
+        self.files = {}   # {파일 키: {'size', 'mtime_ns', 'sheet', 'row', 'cols'}}
+        self.groups = {}  # {이미지 그룹 키: [파일 키, ...]}
+        self.checkpoint = None  # {'token': 작업 식별 토큰, 'complete': 완료 여부, 'saved_at': 저장 시각}
+        self.cost_rates = {}  # 파일 종류별 처리 속도 (CostModel.rates, 다음 실행의 처리 순서 예측에 사용)
+
+    @staticmethod
+    def manifest_path(output_file):
+        """결과 엑셀 파일에 대응하는 매니페스트 경로"""
+        return os.path.splitext(output_file)[0] + '.manifest.json'
+
+    def file_key(self, path):
+        """매니페스트에 쓰는 파일 키 (매니페스트 폴더 기준 상대 경로, 운영체제와 관계없이 같은 형태)
+
+        실행 위치(현재 폴더)와 관계없이 같은 파일이면 같은 키가 되도록 함
+        """
+        path = os.path.abspath(path)
+        try:
+            path = os.path.relpath(path, self.base_dir)
+        except ValueError:
+            pass  # Windows에서 드라이브가 다르면 절대 경로 사용
+        return os.path.normpath(path).replace(os.sep, '/')
+
+    @staticmethod
+    def file_version(path):
+        """파일 버전 (크기, 수정 시각), 파일이 없으면 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def load(self):
+        """매니페스트 읽기 (없거나 손상되었으면 빈 상태로 시작)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != self.VERSION:
+            return False
+        self.files = data.get('files', {})
+        self.groups = data.get('groups', {})
+        self.checkpoint = data.get('checkpoint')
+        self.cost_rates = data.get('cost_rates', {})
+        return True
+
+    def save(self):
+        """매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+        data = {'version': self.VERSION, 'files': self.files, 'groups': self.groups,
+                'checkpoint': self.checkpoint, 'cost_rates': self.cost_rates}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.path)
+
+    def can_resume(self, token):
+        """같은 작업이 완료되지 않은 채 중단된 체크포인트인지"""
+        return bool(self.checkpoint and self.checkpoint.get('token') == token
+                    and not self.checkpoint.get('complete'))
+
+    def is_current(self, path):
+        """이미 처리된 파일이고 그 뒤로 변경되지 않았는지"""
+        entry = self.files.get(self.file_key(path))
+        if not entry:
+            return False
+        version = self.file_version(path)
+        return (version is not None and entry.get('size') == version['size']
+                and entry.get('mtime_ns') == version['mtime_ns'])
+
+    def is_group_current(self, group_key, paths):
+        """이미지 그룹의 구성 파일이 그대로이고 모두 변경되지 않았는지"""
+        members = sorted(self.file_key(path) for path in paths)
+        return self.groups.get(group_key) == members and all(self.is_current(path) for path in paths)
+
+    def record(self, path, sheet, row, cols):
+        """파일의 현재 버전과 삽입 위치 기록"""
+        entry = self.file_version(path) or {}
+        entry.update({'sheet': sheet, 'row': row, 'cols': list(cols)})
+        self.files[self.file_key(path)] = entry
+
+    def record_group(self, group_key, paths, sheet, row, cols):
+        """이미지 그룹 구성과 각 파일 버전 기록"""
+        for path in paths:
+            self.record(path, sheet, row, cols)
+        self.groups[group_key] = sorted(self.file_key(path) for path in paths)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+처리 단계별 시간/횟수 계측
+
+- 단계(폴더 스캔, 파일명 파싱, 동영상 헤더 확인, 동영상 열기, 디코딩, 썸네일 변환, 행 찾기, 이미지 삽입, 저장)마다
+  경과 시간(wall), CPU 시간, 횟수를 누적
+- 단계 안에서 다른 단계를 측정하면 바깥 단계에는 자기 시간만 기록 (중복 집계 없음)
+- 파일별 소요 시간을 모아 가장 오래 걸린 파일(이상치)을 찾음
+- 결과는 JSON 보고서와 요약 문자열로 출력
+"""
+
+import contextlib
+import heapq
+import json
+import os
+import time
+from datetime import datetime
+
+# 단계 이름 (보고서/요약 출력 순서)
+STAGES = ('load', 'scan', 'parse', 'probe', 'video_open', 'decode', 'resize', 'row_lookup', 'insert', 'save')
+
+STAGE_LABELS = {
+    'load': '엑셀 읽기',
+    'scan': '폴더 스캔',
+    'parse': '파일명 파싱',
+    'probe': '동영상 헤더 확인',
+    'video_open': '동영상 열기',
+    'decode': '디코딩',
+    'resize': '썸네일 변환',
+    'row_lookup': '행 찾기',
+    'insert': '이미지 삽입',
+    'save': '저장',
+}
+
+# 보고서에 남기는 이상치 파일 수
+DEFAULT_OUTLIERS = 10
+
+class ProcessingStats:
+    """단계별/파일별 시간 누적"""
+
+    def __init__(self):
+        self.stages = {stage: {'wall': 0.0, 'cpu': 0.0, 'count': 0} for stage in STAGES}
+        self.files = {}  # {파일 경로: {'wall', 'cpu', 'stages': {단계: wall}, 추가 정보}}
+        self.started_at = None
+        self.started = None
+        self.started_cpu = None
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self._stack = []  # 측정 중인 단계 [(단계, 경로, 하위 단계 wall, 하위 단계 cpu)]
+        self.media = None  # 마지막 저장의 이미지 중복 제거 통계 (DedupExcelWriter.media_stats)
+
+    def start(self):
+        """전체 실행 시간 측정 시작"""
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+
+    def stop(self):
+        """전체 실행 시간 측정 종료"""
+        if self.started is not None:
+            self.wall_time = time.perf_counter() - self.started
+            self.cpu_time = time.process_time() - self.started_cpu
+
+    @contextlib.contextmanager
+    def measure(self, stage, path=None):
+        """with 블록의 시간을 단계(와 파일)에 기록"""
+        frame = [stage, path, 0.0, 0.0]
+        self._stack.append(frame)
+        started = time.perf_counter()
+        started_cpu = time.thread_time()  # 디코딩 스레드의 CPU 시간이 섞이지 않도록 이 스레드 기준
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - started_cpu
+            self._stack.pop()
+            if self._stack:
+                # 바깥 단계에서는 이 시간을 빼고 기록
+                self._stack[-1][2] += wall
+                self._stack[-1][3] += cpu
+            self.record(stage, wall - frame[2], cpu - frame[3], path=path)
+
+    def record(self, stage, wall, cpu, count=1, path=None):
+        """단계 시간 직접 기록 (작업자 프로세스에서 측정한 값 등)"""
+        entry = self.stages[stage]
+        entry['wall'] += wall
+        entry['cpu'] += cpu
+        entry['count'] += count
+        if path:
+            file_entry = self.file_entry(path)
+            file_entry['wall'] += wall
+            file_entry['cpu'] += cpu
+            file_entry['stages'][stage] = file_entry['stages'].get(stage, 0.0) + wall
+
+    def file_entry(self, path):
+        entry = self.files.get(path)
+        if entry is None:
+            entry = self.files[path] = {'wall': 0.0, 'cpu': 0.0, 'stages': {}}
+        return entry
+
+    def note_file(self, path, **info):
+        """파일 부가 정보 기록 (크기, 해상도 등)"""
+        self.file_entry(path).update(info)
+
+    def record_capture(self, capture_stats):
+        """capture_frames 통계의 단계별 시간 반영"""
+        path = capture_stats['path']
+        for stage, (wall, cpu, count) in capture_stats.get('timings', {}).items():
+            self.record(stage, wall, cpu, count, path=path)
+        if capture_stats.get('resolution'):
+            self.note_file(path, resolution=capture_stats['resolution'])
+
+    def outliers(self, limit=DEFAULT_OUTLIERS):
+        """가장 오래 걸린 파일 목록 (전체 계측 시간 중 비율 포함)"""
+        measured = sum(entry['wall'] for entry in self.stages.values()) or 1.0
+        result = []
+        for path, entry in heapq.nlargest(limit, self.files.items(), key=lambda item: item[1]['wall']):
+            item = {'path': path, 'share': round(entry['wall'] / measured, 4)}
+            for key, value in entry.items():
+                if key == 'stages':
+                    value = {stage: round(wall, 4) for stage, wall in value.items()}
+                elif isinstance(value, float):
+                    value = round(value, 4)
+                item[key] = value
+            result.append(item)
+        return result
+
+    def to_dict(self):
+        """JSON 보고서 내용"""
+        return {
+            'started_at': self.started_at,
+            'wall_time': round(self.wall_time, 4),
+            'cpu_time': round(self.cpu_time, 4),
+            'files': len(self.files),
+            'stages': {stage: {'wall': round(entry['wall'], 4), 'cpu': round(entry['cpu'], 4),
+                               'count': entry['count']}
+                       for stage, entry in self.stages.items()},
+            'outliers': self.outliers(),
+            'media': self.media,
+        }
+
+    def save(self, path):
+        """JSON 보고서 저장 (임시 파일에 쓴 뒤 교체)"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, path)
+
+    def summary_lines(self, outlier_count=3):
+        """로그용 요약 (단계별 시간과 가장 오래 걸린 파일)"""
+        # 단계 시간에는 작업자 프로세스 시간도 포함되므로 병렬 처리 시 합계가 전체 시간보다 클 수 있음
+        lines = [f"단계별 처리 시간 (전체 {self.wall_time:.2f}초, 메인 프로세스 CPU {self.cpu_time:.2f}초):"]
+        for stage in STAGES:
+            entry = self.stages[stage]
+            if entry['count']:
+                lines.append(f"  {STAGE_LABELS[stage]}: {entry['wall']:.2f}초 "
+                             f"(CPU {entry['cpu']:.2f}초, {entry['count']}회)")
+        outliers = self.outliers(outlier_count)
+        if outliers:
+            lines.append("가장 오래 걸린 파일:")
+            for number, item in enumerate(outliers, 1):
+                extra = f", {item['resolution'][0]}x{item['resolution'][1]}" if item.get('resolution') else ''
+                lines.append(f"  {number}. {os.path.basename(item['path'])} - {item['wall']:.2f}초 "
+                             f"({item['share'] * 100:.0f}%{extra})")
+        return lines
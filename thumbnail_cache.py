@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+실행 간에 유지되는 썸네일 디스크 캐시
+
+- 키: 원본 파일 경로, 크기, 수정 시각(ns), 종류(동영상/이미지), 캡처/썸네일 설정
+- 값: 완성된 썸네일 JPEG 바이트 목록 (동영상은 3장, 이미지는 1장)
+- 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+"""
+
+import hashlib
+import os
+import struct
+
+# 캐시 파일 형식 식별자 (형식이 바뀌면 값을 올려 기존 항목을 무시)
+CACHE_MAGIC = b'THC1'
+CACHE_SUFFIX = '.thumbs'
+
+# 기본 캐시 크기 상한 (512MB)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+class ThumbnailCache:
+    """(경로, 크기, 수정 시각, 설정)을 키로 썸네일을 보관하는 크기 제한 LRU 캐시"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, settings=()):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.settings = repr(tuple(settings))
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # 현재 캐시 크기 계산
+        self.size = 0
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    self.size += entry.stat().st_size
+
+    def make_key(self, path, kind):
+        """캐시 키 생성 (파일이 없으면 None)"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        source = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{kind}|{self.settings}"
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def get(self, path, kind):
+        """캐시된 썸네일 목록 반환 (없으면 None)"""
+        key = self.make_key(path, kind)
+        if not key:
+            self.misses += 1
+            return None
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        thumbnails = self.decode(data)
+        if thumbnails is None:
+            self.misses += 1
+            return None
+
+        # LRU 순서를 위해 사용 시각 갱신
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return thumbnails
+
+    def put(self, path, kind, thumbnails):
+        """썸네일 목록 저장 (기록하지 못하면 OSError, 호출하는 쪽에서 경고로 알림)"""
+        key = self.make_key(path, kind)
+        if not key:
+            return
+        entry_path = self.entry_path(key)
+        data = self.encode(thumbnails)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            old_size = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.writes += 1
+        self.size += len(data) - old_size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """오래 사용하지 않은 항목부터 삭제해 상한의 90% 이하로 줄임"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+            self.evictions += 1
+
+    @staticmethod
+    def encode(thumbnails):
+        header = CACHE_MAGIC + struct.pack(f'<I{len(thumbnails)}I', len(thumbnails),
+                                           *(len(t) for t in thumbnails))
+        return header + b''.join(thumbnails)
+
+    @staticmethod
+    def decode(data):
+        if data[:4] != CACHE_MAGIC or len(data) < 8:
+            return None
+        count, = struct.unpack_from('<I', data, 4)
+        offset = 8 + 4 * count
+        if len(data) < offset:
+            return None
+        thumbnails = []
+        for length in struct.unpack_from(f'<{count}I', data, 8):
+            thumbnails.append(data[offset:offset + length])
+            offset += length
+        if offset != len(data):
+            return None
+        return thumbnails
+
+    def summary(self):
+        """적중/실패 통계 요약 문자열"""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        return (f"썸네일 캐시: 적중 {self.hits} / 실패 {self.misses} ({rate:.0f}%), "
+                f"저장 {self.writes}, 삭제 {self.evictions}, "
+                f"크기 {self.size / 1024 / 1024:.1f}MB / {self.max_bytes / 1024 / 1024:.0f}MB")
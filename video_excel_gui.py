@@ -3,14 +3,25 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import os
 import sys
+import time
+from collections import deque
 from datetime import datetime
 import queue
-import psutil
-import win32gui
-import win32process
+import multiprocessing
 
-# video_excel_processor 모듈 import
-from video_excel_processor import VideoExcelProcessor
+# video_excel_processor 모듈 import (cv2/openpyxl/PIL은 처리 스레드에서 처음 사용할 때 로드됨)
+from video_excel_processor import VideoExcelProcessor, PIPE_FOLDERS
+from processing_events import (CancelToken, EVENT_LOG, EVENT_WARNING, EVENT_FILE_STARTED, EVENT_FILE_FINISHED,
+                               EVENT_PROGRESS, FILE_KIND_LABELS)
+from workbook_lock import find_in_use, IN_USE_LOCKED, IN_USE_MESSAGES
+
+# 처리 중 결과 파일 중간 저장 주기 (초) - 중지/비정상 종료 후 다시 시작하면 이어서 처리
+CHECKPOINT_INTERVAL = 300
+
+# 로그 창에 남겨 두는 최근 줄 수 (전체 로그는 결과 파일 옆 *_processed.log에 기록)
+LOG_VISIBLE_LINES = 2000
+# 로그/진행률 화면 갱신 주기 (ms) - 쌓인 로그는 주기마다 한 번에 추가
+LOG_POLL_INTERVAL = 100
 
 class VideoExcelGUI:
     def __init__(self, root):
@@ -20,10 +31,18 @@ class VideoExcelGUI:
         
         # 처리 상태
         self.is_processing = False
-        self.processor = None
+        self.cancel_token = None  # 처리 중지 요청 (처리 스레드가 파일 사이마다 확인)
+        self.progress_done = 0  # 처리기 진행률 이벤트로 갱신 (처리 스레드에서 기록, 화면 갱신 때 읽음)
+        self.progress_total = 0
+        self.stats = None  # 마지막 처리의 단계별 처리 시간 (ProcessingStats)
         
         # 로그 큐 (스레드 간 통신)
         self.log_queue = queue.Queue()
+        self.log_file = None  # 전체 로그 파일 (처리 중에만 열림)
+        self.visible_lines = 0  # 로그 창에 있는 줄 수
+        
+        # 진행률 (처리 속도는 첫 파일을 처리한 뒤부터 계산)
+        self.rate_started = None  # (시각, 처리한 파일 수)
         
         self.setup_ui()
         self.check_log_queue()
@@ -53,6 +72,17 @@ class VideoExcelGUI:
         ttk.Entry(file_frame, textvariable=self.work_folder, width=60).grid(row=1, column=1, padx=(10, 5), pady=2)
         ttk.Button(file_frame, text="찾기", command=self.select_work_folder).grid(row=1, column=2, pady=2)
         
+        # 동영상 캡처 작업자 수
+        ttk.Label(file_frame, text="동시 처리 작업자 수:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.worker_count = tk.IntVar(value=1)
+        ttk.Spinbox(file_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.worker_count,
+                    width=5).grid(row=2, column=1, sticky=tk.W, padx=(10, 5), pady=2)
+        
+        # 증분 처리 (이전 결과 파일에 새로 추가/변경된 파일만 반영)
+        self.incremental = tk.BooleanVar(value=False)
+        ttk.Checkbutton(file_frame, text="증분 처리 (새 파일/변경된 파일만 이전 결과에 반영)",
+                        variable=self.incremental).grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=2)
+        
         # 처리 버튼 섹션
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=1, column=0, columnspan=2, pady=10)
@@ -66,9 +96,13 @@ class VideoExcelGUI:
         self.exit_button = ttk.Button(button_frame, text="종료", command=self.exit_application)
         self.exit_button.pack(side=tk.LEFT, padx=5)
         
-        # 진행률 바
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        # 진행률 바 (처리한 파일 수 / 전체 파일 수, 처리 속도, 남은 시간)
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress.pack(fill=tk.X)
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.pack(anchor=tk.W)
         
         # 로그 섹션
         log_frame = ttk.LabelFrame(main_frame, text="처리 로그", padding="5")
@@ -107,16 +141,55 @@ class VideoExcelGUI:
         
     def check_log_queue(self):
         """로그 큐 확인 및 UI 업데이트"""
+        self.flush_log_queue()
+        self.update_progress()
+        
+        # 주기마다 다시 확인
+        self.root.after(LOG_POLL_INTERVAL, self.check_log_queue)
+        
+    def flush_log_queue(self):
+        """쌓인 로그를 파일에 기록하고 로그 창에는 한 번에 추가 (최근 LOG_VISIBLE_LINES줄만 유지)"""
+        entries = []
         try:
             while True:
-                log_entry = self.log_queue.get_nowait()
-                self.log_text.insert(tk.END, log_entry)
-                self.log_text.see(tk.END)
+                entries.append(self.log_queue.get_nowait())
         except queue.Empty:
             pass
+        if not entries:
+            return
         
-        # 100ms마다 다시 확인
-        self.root.after(100, self.check_log_queue)
+        if self.log_file:
+            try:
+                self.log_file.write(''.join(entries))
+            except (OSError, ValueError):
+                self.log_file = None
+        
+        # 한 번에 너무 많이 쌓였으면 화면에 남을 최근 줄만 추가
+        visible = deque(entries, maxlen=LOG_VISIBLE_LINES)
+        self.log_text.insert(tk.END, ''.join(visible))
+        self.visible_lines += sum(entry.count('\n') for entry in visible)
+        if self.visible_lines > LOG_VISIBLE_LINES:
+            self.log_text.delete('1.0', f'{self.visible_lines - LOG_VISIBLE_LINES + 1}.0')
+            self.visible_lines = LOG_VISIBLE_LINES
+        self.log_text.see(tk.END)
+        
+    def update_progress(self):
+        """처리 중이면 진행률 바와 처리 속도/남은 시간 갱신"""
+        if not self.is_processing or not self.progress_total:
+            return
+        done = min(self.progress_done, self.progress_total)
+        total = self.progress_total
+        self.progress.config(maximum=total, value=done)
+        
+        text = f"{done}/{total} ({done / total * 100:.0f}%)"
+        now = time.monotonic()
+        if self.rate_started is None:
+            if done:
+                self.rate_started = (now, done)
+        elif done > self.rate_started[1] and now > self.rate_started[0]:
+            rate = (done - self.rate_started[1]) / (now - self.rate_started[0])
+            text += f", {rate:.1f} 파일/초, 남은 시간 약 {format_duration((total - done) / rate)}"
+        self.progress_label.config(text=text)
         
     def validate_inputs(self):
         """입력값 검증"""
@@ -149,18 +222,38 @@ class VideoExcelGUI:
         if not self.validate_inputs():
             return
             
-        # Excel 파일 사용 상태 확인
-        if not self.check_excel_file_status():
+        # Excel 파일 사용 상태 확인 (창이 멈추지 않도록 별도 스레드에서 확인한 뒤 이어서 시작)
+        self.start_button.config(state=tk.DISABLED)
+        paths = [self.excel_path.get(), self.get_output_file()]
+        threading.Thread(target=self.check_excel_file_status, args=(paths, paths[:1]), daemon=True).start()
+        
+    def begin_processing(self, in_use):
+        """사용 중 확인 결과를 받아 처리 시작 (Tk 스레드)"""
+        if in_use and not self.confirm_files_in_use(in_use):
+            self.start_button.config(state=tk.NORMAL)
             return
             
         self.is_processing = True
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.exit_button.config(state=tk.DISABLED)
-        self.progress.start()
-        
-        # 로그 초기화
+        self.cancel_token = CancelToken()
+        self.progress_done = 0
+        self.progress_total = 0
+        self.stats = None
+        self.rate_started = None
+        self.progress.config(value=0)
+        self.progress_label.config(text="")
+        
+        # 로그 초기화 (전체 로그는 결과 파일 옆에 기록)
         self.log_text.delete(1.0, tk.END)
+        self.visible_lines = 0
+        log_path = os.path.splitext(self.get_output_file())[0] + '.log'
+        try:
+            self.log_file = open(log_path, 'a', encoding='utf-8')
+        except OSError as e:
+            self.log_file = None
+            self.log_message(f"로그 파일을 열 수 없습니다: {e}")
         self.log_message("처리를 시작합니다...")
         
         # 별도 스레드에서 처리 실행
@@ -170,58 +263,37 @@ class VideoExcelGUI:
     def stop_processing(self):
         """처리 중지"""
         self.is_processing = False
+        if self.cancel_token:
+            self.cancel_token.cancel()
         self.log_message("처리 중지 요청됨...")
         
-    def is_excel_file_open(self, file_path):
-        """Excel 파일이 열려있는지 확인"""
+    def get_output_file(self):
+        """결과 파일 경로 (작업 폴더의 *_processed.xlsx)"""
+        return os.path.join(self.work_folder.get(),
+                            os.path.basename(self.excel_path.get()).replace('.xlsx', '_processed.xlsx'))
+        
+    def check_excel_file_status(self, paths, read_only=()):
+        """템플릿/결과 파일 사용 중 확인 (별도 스레드, 결과는 Tk 스레드로 전달)
+        read_only: 읽기만 하는 파일 (템플릿, 읽기 전용이어도 사용 중으로 보지 않음)"""
         try:
-            filename = os.path.basename(file_path)
-            
-            # 프로세스 목록에서 Excel 프로세스 찾기
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    if proc.info['name'].lower() in ['excel.exe', 'et.exe']:  # MS Excel, WPS Office
-                        # 윈도우 제목에서 파일명 확인
-                        def enum_windows_callback(hwnd, windows):
-                            if win32gui.IsWindowVisible(hwnd):
-                                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                                if pid == proc.info['pid']:
-                                    title = win32gui.GetWindowText(hwnd)
-                                    windows.append(title)
-                            return True
-                        
-                        windows = []
-                        win32gui.EnumWindows(enum_windows_callback, windows)
-                        
-                        for title in windows:
-                            if filename.lower() in title.lower():
-                                return True
-                                
-                except (psutil.NoSuchProcess, psutil.AccessDenied, Exception):
-                    continue
-                    
-            return False
-            
-        except Exception as e:
-            # 확인 실패 시 안전하게 False 반환
-            return False
-            
-    def check_excel_file_status(self):
-        """Excel 파일 상태 확인"""
-        if not self.excel_path.get():
-            return True
-            
-        if self.is_excel_file_open(self.excel_path.get()):
-            result = messagebox.askyesno(
-                "파일 사용 중", 
-                f"선택한 Excel 파일이 현재 열려있습니다:\n{os.path.basename(self.excel_path.get())}\n\n"
-                "파일이 열려있는 상태에서 처리하면 오류가 발생할 수 있습니다.\n"
-                "Excel 파일을 닫고 다시 시도하시겠습니까?\n\n"
-                "계속 진행하려면 '예'를, 취소하려면 '아니오'를 선택하세요."
-            )
-            return result
-            
-        return True
+            # 잠금/잠금 파일로 모를 때만 엑셀 창 제목 확인 (Windows)
+            in_use = find_in_use(paths, window_scan=True, read_only=read_only)
+        except Exception:
+            # 확인 실패 시 사용 중이 아닌 것으로 처리
+            in_use = []
+        self.root.after(0, lambda: self.begin_processing(in_use))
+        
+    def confirm_files_in_use(self, in_use):
+        """사용 중인 파일을 알리고 계속 진행할지 확인"""
+        lines = [f"{os.path.basename(path)} ({IN_USE_MESSAGES[reason]})" for path, reason in in_use]
+        message = "다음 Excel 파일이 현재 열려있습니다:\n" + "\n".join(lines) + "\n\n"
+        if any(path == self.get_output_file() and reason == IN_USE_LOCKED for path, reason in in_use):
+            message += "결과 파일이 열려있으면 처리 후 저장할 수 없습니다.\n"
+        else:
+            message += "파일이 열려있는 상태에서 처리하면 오류가 발생할 수 있습니다.\n"
+        message += ("Excel 파일을 닫은 뒤 진행하는 것을 권장합니다.\n\n"
+                    "계속 진행하려면 '예'를, 취소하려면 '아니오'를 선택하세요.")
+        return messagebox.askyesno("파일 사용 중", message)
         
     def exit_application(self):
         """애플리케이션 종료"""
@@ -236,6 +308,8 @@ class VideoExcelGUI:
                 
             # 처리 중지
             self.is_processing = False
+            if self.cancel_token:
+                self.cancel_token.cancel()
             self.log_message("애플리케이션 종료 중...")
             
         self.root.quit()
@@ -244,22 +318,25 @@ class VideoExcelGUI:
     def process_files(self):
         """파일 처리 (별도 스레드)"""
         try:
-            # 작업 디렉토리 변경
-            original_dir = os.getcwd()
-            os.chdir(self.work_folder.get())
-            
-            # 처리기 생성
-            excel_file = os.path.basename(self.excel_path.get())
-            
-            # Excel 파일을 작업 폴더로 복사 (필요한 경우)
-            import shutil
-            if not os.path.exists(excel_file):
-                shutil.copy2(self.excel_path.get(), excel_file)
-                self.log_message(f"Excel 파일 복사: {excel_file}")
-            
-            # 커스텀 처리기 생성
-            processor = CustomVideoExcelProcessor(excel_file, None, None, self.log_message, self)
-            processor.process_all()
+            # 템플릿은 선택한 위치에서 읽고 결과는 작업 폴더에 저장 (작업 디렉토리 변경/템플릿 복사 없음)
+            work_folder = self.work_folder.get()
+            excel_file = self.excel_path.get()
+            output_file = self.get_output_file()
+            roots = [os.path.join(work_folder, folder_name) for folder_name in PIPE_FOLDERS.values()]
+            
+            # 처리기 생성 (진행 상황은 이벤트로 받고, 처리 시간 보고서는 결과 파일 옆에 저장)
+            try:
+                workers = int(self.worker_count.get())
+            except (tk.TclError, ValueError):
+                workers = 1
+            processor = VideoExcelProcessor(excel_file, None, None, workers,
+                                            incremental=self.incremental.get(),
+                                            checkpoint_interval=CHECKPOINT_INTERVAL,
+                                            output_file=output_file, roots=roots,
+                                            report_file=os.path.splitext(output_file)[0] + '.report.json',
+                                            observers=[self.handle_processing_event],
+                                            cancel_token=self.cancel_token)
+            self.stats = processor.process_all()
             
             self.log_message("모든 처리가 완료되었습니다!")
             
@@ -267,283 +344,67 @@ class VideoExcelGUI:
             self.log_message(f"처리 중 오류 발생: {str(e)}")
             
         finally:
-            # 원래 디렉토리로 복원
-            os.chdir(original_dir)
-            
             # UI 상태 복원
             self.root.after(0, self.processing_finished)
             
+    def handle_processing_event(self, event):
+        """처리기 이벤트를 로그와 진행률로 변환 (처리 스레드에서 호출되므로 큐/값만 갱신)"""
+        if event.type == EVENT_PROGRESS:
+            self.progress_total = event.total
+            self.progress_done = event.done
+            return
+        if event.type in (EVENT_LOG, EVENT_WARNING):
+            self.log_message(event.message)
+            return
+        
+        name = os.path.basename(event.path) if event.path else ''
+        if event.type == EVENT_FILE_STARTED and event.kind != 'invalid':
+            icon = '🎬' if event.kind == 'video' else '🖼️'
+            message = f"{icon} [{event.done}/{event.total}] {name}"
+            if event.kind == 'image':
+                message += f" (총 {event.count}개 중 첫 번째)"
+            self.log_message(message)
+        elif event.type == EVENT_FILE_FINISHED:
+            if event.ok:
+                self.log_message(f"✅ {name} - {FILE_KIND_LABELS[event.kind]} 처리 완료")
+            else:
+                self.log_message(f"❌ {name} - {event.reason}")
+            
     def processing_finished(self):
         """처리 완료 후 UI 상태 복원"""
         self.is_processing = False
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.exit_button.config(state=tk.NORMAL)
-        self.progress.stop()
+        
+        # 남은 로그를 기록하고 로그 파일 닫기
+        self.flush_log_queue()
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
+        
+        if self.progress_total and self.stats is not None:
+            done = min(self.progress_done, self.progress_total)
+            self.progress.config(maximum=self.progress_total, value=done)
+            elapsed = self.stats.wall_time
+            rate = f", {done / elapsed:.1f} 파일/초" if elapsed else ''
+            self.progress_label.config(
+                text=f"{done}/{self.progress_total} 처리, {format_duration(elapsed)} 소요{rate}")
 
 
-class CustomVideoExcelProcessor(VideoExcelProcessor):
-    """GUI용 커스텀 처리기"""
-    
-    def __init__(self, excel_file, video_folder, image_folder, log_callback, gui_instance):
-        super().__init__(excel_file, video_folder, image_folder)
-        self.log_callback = log_callback
-        self.gui = gui_instance
-        self.processed_files = 0
-        self.total_files = 0
-        
-    def log(self, message):
-        """로그 출력"""
-        if self.log_callback:
-            self.log_callback(message)
-            
-    def count_total_files(self):
-        """전체 파일 수 계산"""
-        total = 0
-        for folder_name in ["입상관", "횡주관"]:
-            if os.path.exists(folder_name):
-                # 동영상 파일 수
-                video_count = 0
-                # 이미지 파일 그룹 수
-                image_groups = {}
-                
-                for filename in os.listdir(folder_name):
-                    if filename.endswith('.mp4'):
-                        video_count += 1
-                    elif filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                        # 파일명에서 정보 추출하여 그룹핑
-                        pipe_type = '입상' if folder_name == '입상관' else '횡주'
-                        image_info = self.extract_image_info(filename, pipe_type)
-                        if image_info:
-                            if pipe_type == '횡주':
-                                key = (image_info['dong'], image_info['ho'], image_info['usage'], image_info['line_detail'])
-                            else:
-                                key = (image_info['dong'], image_info['ho'], image_info['usage'])
-                            
-                            if key not in image_groups:
-                                image_groups[key] = 0
-                            image_groups[key] += 1
-                
-                total += video_count + len(image_groups)
-        return total
-        
-    def process_all(self):
-        """전체 처리 실행 (GUI용 오버라이드)"""
-        if not self.load_excel():
-            return
-            
-        # 전체 파일 수 계산
-        self.total_files = self.count_total_files()
-        self.log(f"처리할 파일 수: {self.total_files}개")
-        
-        try:
-            # 입상관 폴더 처리
-            if os.path.exists("입상관"):
-                self.log("=== 입상관 파일 처리 시작 ===")
-                self.process_folder("입상관", "입상")
-            
-            # 횡주관 폴더 처리
-            if os.path.exists("횡주관"):
-                self.log("=== 횡주관 파일 처리 시작 ===")
-                self.process_folder("횡주관", "횡주")
-            
-            self.save_excel()
-            
-        finally:
-            # 작업 완료 후 캡처 이미지 정리
-            self.cleanup_captured_images()
-            
-    def process_folder(self, folder_path, pipe_type):
-        """폴더 처리 (GUI용 오버라이드)"""
-        if not os.path.exists(folder_path):
-            self.log(f"폴더를 찾을 수 없습니다: {folder_path}")
-            return
-        
-        # 캡처 이미지 저장할 폴더 생성
-        capture_dir = os.path.join(os.getcwd(), 'captured_images')
-        os.makedirs(capture_dir, exist_ok=True)
-        
-        # 파일 목록 가져오기
-        all_files = os.listdir(folder_path)
-        
-        # 이미지 파일 그룹핑 (동, 호, 용도별로)
-        image_groups = {}
-        
-        # 이미지 파일들을 먼저 그룹핑
-        for filename in all_files:
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                image_info = self.extract_image_info(filename, pipe_type)
-                if image_info:
-                    if pipe_type == '횡주':
-                        key = (image_info['dong'], image_info['ho'], image_info['usage'], image_info['line_detail'])
-                    else:
-                        key = (image_info['dong'], image_info['ho'], image_info['usage'])
-                    
-                    if key not in image_groups:
-                        image_groups[key] = []
-                    image_groups[key].append((filename, image_info))
-        
-        # 처리할 파일들 (동영상 + 그룹당 첫 번째 이미지)
-        files_to_process = []
-        
-        # 동영상 파일 추가
-        for filename in all_files:
-            if filename.endswith('.mp4'):
-                files_to_process.append(('video', filename))
-        
-        # 이미지 그룹별 첫 번째 파일만 추가
-        for key, files_info in image_groups.items():
-            filename, image_info = files_info[0]
-            total_count = len(files_info)
-            files_to_process.append(('image', filename, total_count))
-        
-        # 파일 처리
-        for file_info in files_to_process:
-            # 중지 요청 확인
-            if hasattr(self.gui, 'is_processing') and not self.gui.is_processing:
-                self.log("처리가 중지되었습니다.")
-                return
-                
-            self.processed_files += 1
-            
-            if file_info[0] == 'video':
-                filename = file_info[1]
-                progress_msg = f"[{self.processed_files}/{self.total_files}] {filename}"
-                
-                # 동영상 처리
-                video_info = self.extract_video_info(filename, pipe_type)
-                if not video_info:
-                    self.log(f"❌ {progress_msg} - 파일명 패턴 불일치")
-                    continue
-                
-                self.log(f"🎬 {progress_msg}")
-                
-                # 해당 단지, 유형 워크시트 선택
-                worksheet = self.get_or_create_worksheet(video_info['complex'], pipe_type)
-                
-                # 해당하는 행 찾거나 생성
-                if pipe_type == '횡주':
-                    row = self.find_or_create_row(worksheet, pipe_type, video_info['dong'], 
-                                                video_info['ho'], video_info['usage'], 
-                                                video_info['line_detail'])
-                else:
-                    row = self.find_or_create_row(worksheet, pipe_type, video_info['dong'], 
-                                                video_info['ho'], video_info['usage'])
-                if not row:
-                    continue
-                
-                # 동영상 캡처
-                video_path = os.path.join(folder_path, filename)
-                captured_files = self.capture_video_frames(video_path, capture_dir)
-                
-                if len(captured_files) >= 3:
-                    # 이미지 삽입
-                    self.insert_video_images(worksheet, pipe_type, captured_files, row)
-                    self.log(f"✅ {filename} - 동영상 처리 완료")
-                else:
-                    self.log(f"❌ {filename} - 프레임 캡처 실패")
-            
-            elif file_info[0] == 'image':
-                filename = file_info[1]
-                total_count = file_info[2]
-                progress_msg = f"[{self.processed_files}/{self.total_files}] {filename}"
-                
-                # 이미지 처리
-                image_info = self.extract_image_info(filename, pipe_type)
-                if not image_info:
-                    self.log(f"❌ {progress_msg} - 파일명 패턴 불일치")
-                    continue
-                
-                self.log(f"🖼️ {progress_msg} (총 {total_count}개 중 첫 번째)")
-                
-                # 해당 단지, 유형 워크시트 선택
-                worksheet = self.get_or_create_worksheet(image_info['complex'], pipe_type)
-                
-                # 해당하는 행 찾거나 생성
-                if pipe_type == '횡주':
-                    row = self.find_or_create_row(worksheet, pipe_type, image_info['dong'], 
-                                                image_info['ho'], image_info['usage'], 
-                                                image_info['line_detail'])
-                else:
-                    row = self.find_or_create_row(worksheet, pipe_type, image_info['dong'], 
-                                                image_info['ho'], image_info['usage'])
-                if not row:
-                    continue
-                
-                # 이미지 및 텍스트 정보 입력
-                self.process_issue_image(worksheet, folder_path, filename, image_info, row, total_count)
-                self.log(f"✅ {filename} - 이미지 처리 완료")
-                
-    def insert_video_images(self, worksheet, pipe_type, captured_files, row):
-        """동영상 이미지 삽입"""
-        if pipe_type == '입상':
-            position_col = self.find_column_by_name(worksheet, '위치사진')
-            check1_col = self.find_column_by_name(worksheet, '점검사진1')
-            check2_col = self.find_column_by_name(worksheet, '점검사진2')
-            
-            if position_col:
-                self.insert_image_to_cell(worksheet, captured_files[0], row, position_col)
-            if check1_col:
-                self.insert_image_to_cell(worksheet, captured_files[1], row, check1_col)
-            if check2_col:
-                self.insert_image_to_cell(worksheet, captured_files[2], row, check2_col)
-        
-        else:  # 횡주
-            position_col = self.find_column_by_name(worksheet, '위치사진')
-            check1_col = 7
-            check2_col = 8
-            
-            if position_col:
-                self.insert_image_to_cell(worksheet, captured_files[0], row, position_col)
-            self.insert_image_to_cell(worksheet, captured_files[1], row, check1_col)
-            self.insert_image_to_cell(worksheet, captured_files[2], row, check2_col)
-            
-    def process_issue_image(self, worksheet, folder_path, filename, image_info, row, total_count=1):
-        """이상 이미지 처리"""
-        # 컬럼 번호 찾기
-        issue_image_col = self.find_column_by_name(worksheet, '이상배관사진')
-        issue_col = self.find_column_by_name(worksheet, '이상유무')
-        location_col = self.find_column_by_name(worksheet, '위치')
-        
-        # 이미지 삽입
-        if issue_image_col:
-            image_path = os.path.join(folder_path, filename)
-            self.insert_image_to_cell(worksheet, image_path, row, issue_image_col)
-        
-        # 텍스트 정보 입력
-        if issue_col:
-            worksheet.cell(row, issue_col).value = image_info['issue']
-        if location_col:
-            # 위치 정보에 총 개수 추가
-            location_text = f"{image_info['location']}({total_count})" if total_count > 1 else image_info['location']
-            worksheet.cell(row, location_col).value = location_text
-            
-    def insert_image_to_cell(self, worksheet, image_path, row, col):
-        """이미지 삽입 (로그 제거)"""
-        try:
-            # 이미지 크기 조정
-            resized_image = self.resize_image_for_excel(image_path)
-            
-            # 엑셀에 이미지 삽입
-            from openpyxl.drawing.image import Image as OpenpyxlImage
-            img = OpenpyxlImage(resized_image)
-            
-            # 셀 위치 계산
-            cell_address = worksheet.cell(row, col).coordinate
-            img.anchor = cell_address
-            
-            # 행 높이와 열 너비 조정
-            worksheet.row_dimensions[row].height = 74
-            worksheet.column_dimensions[worksheet.cell(row, col).column_letter].width = 13
-            
-            worksheet.add_image(img)
-            return True
-        except Exception as e:
-            self.log(f"이미지 삽입 실패: {e}")
-            return False
+def format_duration(seconds):
+    """남은/걸린 시간 표시 (예: 1시간 5분, 3분 20초, 45초)"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}시간 {seconds % 3600 // 60}분"
+    if seconds >= 60:
+        return f"{seconds // 60}분 {seconds % 60}초"
+    return f"{seconds}초"
 
 
 def main():
+    # PyInstaller 실행 파일에서 프로세스 풀 작업자가 GUI를 다시 띄우지 않도록 함
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = VideoExcelGUI(root)
     root.mainloop()
@@ -4,25 +4,389 @@
 동영상 파일에서 캡처 이미지를 생성하고 엑셀 파일에 삽입하는 스크립트
 """
 
-import cv2
 import os
 import re
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.drawing.image import Image as OpenpyxlImage
-from PIL import Image, ImageOps
-import tempfile
-from pathlib import Path
+from io import BytesIO
+import argparse
+import fnmatch
 import hashlib
-import shutil
+import sys
+import time
+# cv2, openpyxl, PIL은 처음 사용할 때 불러옴 (GUI 창과 커맨드라인 시작을 늦추지 않도록)
+from thumbnail_cache import ThumbnailCache, DEFAULT_MAX_BYTES
+from processing_manifest import ProcessingManifest
+from processing_stats import ProcessingStats
+from processing_events import (ProcessingEvent, CancelToken, print_event, EVENT_LOG, EVENT_WARNING,
+                               EVENT_FILE_STARTED, EVENT_FILE_FINISHED, EVENT_PROGRESS, EVENT_SUMMARY,
+                               PROGRESS_EVENT_INTERVAL)
+from workbook_lock import can_replace, check_in_use, IN_USE_LOCKED, IN_USE_MESSAGES
+from video_probe import probe_video, ProbeError
+from cost_model import CostModel, DispatchQueue
+
+# 헤더 행은 3번째 행
+HEADER_ROW = 3
+
+# 시트 유형별 컬럼 스키마 {컬럼명: 헤더에서 찾지 못했을 때 사용할 기본 컬럼 번호}
+# 횡주 양식은 라인 상세/용도/배관경/점검사진 헤더가 병합되어 있어 기본 위치를 둠
+COLUMN_SCHEMA = {
+    '입상': {
+        '동': None, '라인': None, '용도': None, '배관경': None,
+        '위치사진': None, '점검사진1': None, '점검사진2': None,
+        '이상배관사진': None, '이상유무': None, '위치': None,
+    },
+    '횡주': {
+        '동': None, '라인': None, '라인상세': 3, '용도': 4, '배관경': 5,
+        '위치사진': None, '점검사진1': 7, '점검사진2': 8,
+        '이상배관사진': None, '이상유무': None, '위치': None,
+    },
+}
+
+# 파일명 패턴 (모듈 로드 시 한 번만 컴파일)
+# 동영상 예: "1102동 4호 입상관 세탁.mp4", "1101동 1-1호 횡주관 배수.mp4"
+# 이미지 예: "1102동 4호 입상관 세탁_이물질_옥상.jpg", "1101동 1-1호 횡주관 배수_이물질_옥상.jpg"
+VIDEO_PATTERNS = {
+    '입상': re.compile(r'(\d+동)\s+(\d+호)\s+입상관\s+(.+)\.mp4', re.IGNORECASE),
+    '횡주': re.compile(r'(\d+동)\s+(\d+-\d+호)\s+횡주관\s+(.+)\.mp4', re.IGNORECASE),
+}
+IMAGE_PATTERNS = {
+    '입상': re.compile(r'(\d+동)\s+(\d+호)\s+입상관\s+(.+?)_(.+?)_(.+?)\.(jpg|jpeg|png)', re.IGNORECASE),
+    '횡주': re.compile(r'(\d+동)\s+(\d+-\d+호)\s+횡주관\s+(.+?)_(.+?)_(.+?)\.(jpg|jpeg|png)', re.IGNORECASE),
+}
+HO_DETAIL_PATTERN = re.compile(r'(\d+)-(\d+)호')
+ISSUE_MARK_PATTERN = re.compile(r'\(이상배관\)')
+VIDEO_EXTENSIONS = ('.mp4',)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# 배관 유형별 폴더 이름 (폴더 경로나 파일명에 들어 있으면 해당 유형으로 판단)
+PIPE_FOLDERS = {'입상': '입상관', '횡주': '횡주관'}
+
+# 동영상 작업량 환산 (가상 현장에서 측정한 파일별 처리 시간에 맞춘 값, CostModel이 단위당 속도를 보정)
+VIDEO_SETUP_FRAMES = 20  # 동영상 열기/썸네일 변환 고정 비용 (디코딩 프레임 수로 환산)
+VIDEO_BYTE_WEIGHT = 10   # 파일 바이트당 작업량 (화소 수로 환산)
+
+class FileJob:
+    """처리할 파일 하나 (파일명에서 읽은 동/호/용도와 경로, 크기)"""
+    
+    __slots__ = ('kind', 'pipe_type', 'path', 'filename', 'size', 'dong', 'ho', 'usage',
+                 'line_detail', 'complex', 'issue', 'location', 'media_info')
+    
+    def __init__(self, kind, pipe_type, path, size, info):
+        self.kind = kind  # 'video' 또는 'image'
+        self.pipe_type = pipe_type
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.size = size
+        self.dong = info['dong']
+        self.ho = info['ho']
+        self.usage = info['usage']
+        self.line_detail = info.get('line_detail')
+        self.complex = info['complex']
+        self.issue = info.get('issue')
+        self.location = info.get('location')
+        self.media_info = None  # 동영상 헤더 정보 (VideoInfo, 처리 목록을 만들 때 읽음)
+    
+    @property
+    def cost(self):
+        """예상 처리 작업량 (동영상은 디코딩할 화소 수 + 파일 크기 환산값, 헤더 정보가 없으면 파일 크기)"""
+        info = self.media_info
+        if info is None:
+            return self.size
+        # 길이/fps/키프레임 간격으로 정한 캡처 계획대로 디코딩할 프레임 + 열기/썸네일 변환 고정 비용,
+        # 비트레이트가 높을수록 늘어나는 디코딩 시간은 파일 크기로 반영
+        frames = estimate_decoded_frames(info.frame_count, info.fps, info.gop_frames) + VIDEO_SETUP_FRAMES
+        return frames * info.width * info.height + VIDEO_BYTE_WEIGHT * self.size
+    
+    @property
+    def row_key(self):
+        """엑셀 행을 구분하는 키 (동, 호, 용도[, 라인 상세])"""
+        if self.pipe_type == '횡주':
+            return (self.dong, self.ho, self.usage, self.line_detail)
+        return (self.dong, self.ho, self.usage)
+
+class InputScan:
+    """배관 유형 하나의 입력 파일 스캔 결과 (진행률 계산, 그룹핑, 처리에 같이 사용)"""
+    
+    __slots__ = ('pipe_type', 'videos', 'invalid_videos', 'image_groups')
+    
+    def __init__(self, pipe_type):
+        self.pipe_type = pipe_type
+        self.videos = []          # [FileJob] 파일명 패턴이 맞는 동영상
+        self.invalid_videos = []  # [경로] 파일명 패턴이 맞지 않는 동영상
+        self.image_groups = {}    # {행 키: [FileJob]} 같은 행에 들어가는 이미지 묶음
+    
+    @property
+    def total(self):
+        """진행률 계산용 처리 단위 수 (동영상 + 이미지 그룹)"""
+        return len(self.videos) + len(self.invalid_videos) + len(self.image_groups)
+
+# 엑셀 셀에 들어가는 썸네일 크기 및 JPEG 품질
+THUMBNAIL_SIZE = (102, 96)
+THUMBNAIL_QUALITY = 70
+
+# 사진을 축소 디코딩할 때 썸네일 대비 최소 배율 (이 크기에서 LANCZOS로 줄여 화질 유지)
+DRAFT_OVERSAMPLE = 3
+
+# 엑셀 저장 방식: openpyxl 기본 저장 / 이미지를 스풀 파일에 두고 순차 기록하는 스트리밍 저장
+OUTPUT_BACKENDS = ('openpyxl', 'streaming')
+
+# 커맨드라인 종료 코드
+EXIT_OK = 0           # 모든 파일 처리 완료
+EXIT_PARTIAL = 1      # 결과는 저장했지만 처리하지 못한 파일이 있음
+EXIT_USAGE = 2        # 잘못된 인자 (argparse)
+EXIT_INPUT = 3        # 템플릿, 작업 폴더나 썸네일 캐시 폴더를 읽을 수 없음
+EXIT_SAVE = 4         # 결과 파일 저장 실패
+EXIT_INTERRUPTED = 130  # Ctrl+C 등으로 중단 (체크포인트 저장, 다시 실행하면 이어서 처리)
+
+def make_thumbnail(image, width=THUMBNAIL_SIZE[0], height=THUMBNAIL_SIZE[1]):
+    """PIL 이미지(Image.open 직후, 아직 디코딩 전)를 엑셀용 썸네일 JPEG 바이트로 변환
+    
+    JPEG는 DCT 축소 디코딩(draft, 1/2~1/8)으로 썸네일의 DRAFT_OVERSAMPLE배 이상인 가장 작은 크기로만 디코딩함
+    (12MP 사진도 수백 픽셀 크기로 디코딩되어 시간과 메모리가 크게 줄어듦).
+    EXIF 방향(휴대폰 세로 사진)은 축소 디코딩된 작은 이미지에 적용함.
+    """
+    from PIL import Image, ImageOps
+    
+    if image.format == 'JPEG':
+        # 회전 전 크기 기준이므로 가로/세로 중 큰 쪽으로 요청
+        draft_size = max(width, height) * DRAFT_OVERSAMPLE
+        image.draft('RGB', (draft_size, draft_size))
+    image = ImageOps.exif_transpose(image)
+    
+    # 비율 무시하고 정확한 크기로 조정 (PNG 등 큰 이미지는 정수 배 축소 뒤 LANCZOS)
+    img_resized = image.convert('RGB').resize((width, height), Image.Resampling.LANCZOS,
+                                              reducing_gap=DRAFT_OVERSAMPLE)
+    buffer = BytesIO()
+    img_resized.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+# 프레임/썸네일 배열 버퍼 (프로세스마다 한 벌을 만들어 프레임과 동영상 사이에서 재사용)
+_frame_buffers = {}
+
+def frame_to_thumbnail(frame):
+    """캡처한 프레임(BGR 배열)을 디스크를 거치지 않고 썸네일 JPEG 바이트로 변환"""
+    import cv2
+    
+    # 원본 해상도에서는 아무 변환도 하지 않고 먼저 영역 보간으로 축소
+    key = ('thumbnail',) + frame.shape[2:]
+    small = cv2.resize(frame, THUMBNAIL_SIZE, dst=_frame_buffers.get(key), interpolation=cv2.INTER_AREA)
+    _frame_buffers[key] = small
+    
+    # 축소된 BGR 배열을 바로 JPEG로 인코딩 (색 변환은 인코더가 작은 이미지에서만 수행)
+    ok, encoded = cv2.imencode('.jpg', small, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_QUALITY])
+    if not ok:
+        raise ValueError("JPEG 인코딩 실패")
+    return encoded.tobytes()
+
+# 썸네일 캐시 키에 포함되는 설정 (캡처 시점 계획이나 썸네일 형식이 바뀌면 값을 올림)
+CAPTURE_PLAN_VERSION = 'start2s-middle-end2s'
+IMAGE_DECODE_VERSION = 'draft3x-exif'
+
+# 작업자당 넘겨 둘 파일 수 (처리 중인 파일 + 다음 파일, 나머지 처리 순서는 자리가 날 때마다 다시 정함)
+PIPELINE_DEPTH = 2
+
+# 엑셀 기록을 기다리는 썸네일 최대 크기 (썸네일 하나 약 15KB, 동영상 약 1,400개분)
+# 넘으면 긴 파일 우선 대신 기록할 차례에 가까운 파일부터 넘겨 더 늘어나지 않게 함
+MAX_BUFFERED_BYTES = 64 * 1024 * 1024
+
+# 엑셀 기록을 기다리는 동안 중지 요청을 확인하는 간격 (초)
+CANCEL_CHECK_INTERVAL = 0.1
+
+# 캡처 시점을 정할 때 가정하는 키프레임 간격 (휴대폰 H.264 영상은 대개 1초 내외)
+DEFAULT_GOP_SECONDS = 1.0
+
+def plan_capture_frames(total_frames, fps):
+    """캡처할 프레임 번호 (시작 2초, 중간, 마지막 2초)"""
+    duration = total_frames / fps
+    times = [2.0, duration/2, max(2.0, duration-2.0)]
+    return [int(time_sec * fps) for time_sec in times]
+
+def estimate_decoded_frames(total_frames, fps, gop_frames):
+    """capture_frames가 디코딩할 프레임 수 예상 (grab으로 전진하는 프레임, seek하면 키프레임부터 평균 GOP 절반)"""
+    decoded = 0
+    position = 0
+    for frame_number in sorted(set(plan_capture_frames(total_frames, fps))):
+        if 0 <= frame_number - position <= gop_frames * 2:
+            decoded += frame_number - position + 1
+        else:
+            decoded += min(frame_number, gop_frames) // 2 + 1
+        position = frame_number + 1
+    return decoded
+
+def capture_frames(video_path, gop_frames=None, info=None):
+    """동영상에서 3개 프레임 캡처 (프로세스 풀 작업자에서도 호출되므로 모듈 함수로 둠)
+    
+    info(VideoInfo)가 있으면 컨테이너 헤더의 프레임 수/fps/키프레임 간격을 사용하고, 없으면 디코더 값을 사용
+    (휴대폰 영상은 디코더가 프레임 수나 fps를 0 또는 틀린 값으로 알려 주는 경우가 있음).
+    요청 프레임을 정렬해 한 방향으로만 진행하며, 다음 프레임까지의 거리가 키프레임 간격의
+    두 배 이내면 grab()으로 디코딩만 하며 전진하고 그보다 멀면 seek 함 (방식은 구간마다 정하므로
+    짧거나 키프레임이 촘촘한 파일은 모두 grab, 길고 키프레임 간격이 넓은 파일은 모두 seek이 됨).
+    프레임 오차는 디코딩된 프레임의 타임스탬프 기준 (타임스탬프가 없는 프레임은 기록하지 않음).
+    반환값: (썸네일 JPEG 바이트 목록, 캡처 통계)
+    캡처 통계의 timings에는 단계별 (경과 시간, CPU 시간, 횟수)를 기록함 (ProcessingStats.record_capture)
+    CPU 시간은 이 스레드 기준 (처리기 스레드에서 실행되어도 엑셀 기록 스레드 시간이 섞이지 않음)
+    작업자 프로세스에서는 출력할 수 없으므로 경고는 캡처 통계의 warnings에 모아 둠
+    """
+    import cv2
+    
+    stats = {'path': video_path, 'mode': None, 'decode_time': 0.0, 'encode_time': 0.0,
+             'frame_errors': [], 'grabbed': 0, 'seeks': 0, 'resolution': None, 'timings': {}, 'warnings': [],
+             'probe': 'container' if info else 'decoder'}
+    started = time.perf_counter()
+    started_cpu = time.thread_time()
+    cap = cv2.VideoCapture(video_path)
+    opened = cap.isOpened()
+    if opened and info:
+        total_frames = info.frame_count
+        fps = info.fps
+        stats['resolution'] = info.resolution
+        gop_frames = gop_frames or info.gop_frames
+    elif opened:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        stats['resolution'] = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    stats['timings']['video_open'] = (time.perf_counter() - started, time.thread_time() - started_cpu, 1)
+    if not opened:
+        stats['warnings'].append(f"동영상 열기 실패: {video_path}")
+        return [], stats
+    
+    started = time.perf_counter()
+    started_cpu = time.thread_time()
+    encode_cpu = 0.0
+    if total_frames <= 0 or fps <= 0:
+        stats['warnings'].append(f"동영상 정보 읽기 실패 (프레임 수 {total_frames}, fps {fps}): {video_path}")
+        cap.release()
+        return [], stats
+    
+    frame_numbers = plan_capture_frames(total_frames, fps)
+    if not gop_frames:
+        gop_frames = max(1, round(fps * DEFAULT_GOP_SECONDS))
+    
+    thumbnails_by_frame = {}
+    position = 0  # 다음 read/grab으로 디코딩될 프레임 번호
+    for frame_number in sorted(set(frame_numbers)):
+        if 0 <= frame_number - position <= gop_frames * 2:
+            while position < frame_number and cap.grab():
+                position += 1
+                stats['grabbed'] += 1
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            position = frame_number
+            stats['seeks'] += 1
+        
+        # 디코딩 버퍼도 해상도가 같으면 재사용
+        ret, frame = cap.read(_frame_buffers.get('frame')) if position == frame_number else (False, None)
+        if not ret:
+            stats['warnings'].append(f"프레임 캡처 실패: {frame_number / fps:.1f}초")
+            continue
+        
+        # 디코딩된 프레임의 타임스탬프로 실제 프레임 번호를 구해 정확도 기록
+        # (CAP_PROP_POS_FRAMES는 set() 뒤에 요청한 번호를 그대로 돌려주므로 seek 오차를 알 수 없음)
+        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if timestamp > 0 or frame_number == 0:
+            stats['frame_errors'].append(round(timestamp * fps / 1000) - frame_number)
+        position = frame_number + 1
+        _frame_buffers['frame'] = frame
+        encode_started = time.perf_counter()
+        encode_started_cpu = time.thread_time()
+        try:
+            thumbnails_by_frame[frame_number] = frame_to_thumbnail(frame)
+        except Exception as e:
+            stats['warnings'].append(f"프레임 변환 실패: {e}")
+        stats['encode_time'] += time.perf_counter() - encode_started
+        encode_cpu += time.thread_time() - encode_started_cpu
+    
+    cap.release()
+    # 디코딩 시간에는 썸네일 변환(encode_time)을 포함하지 않음
+    stats['decode_time'] = time.perf_counter() - started - stats['encode_time']
+    stats['timings']['decode'] = (stats['decode_time'], time.thread_time() - started_cpu - encode_cpu, 1)
+    stats['timings']['resize'] = (stats['encode_time'], encode_cpu, len(thumbnails_by_frame))
+    if stats['seeks'] == 0:
+        stats['mode'] = 'grab'
+    elif stats['grabbed'] == 0:
+        stats['mode'] = 'seek'
+    else:
+        stats['mode'] = 'mixed'
+    
+    thumbnails = [thumbnails_by_frame[n] for n in frame_numbers if n in thumbnails_by_frame]
+    return thumbnails, stats
+
+def image_to_thumbnail(image_path):
+    """이미지 파일을 썸네일로 변환 (프로세스 풀 작업자에서도 호출됨)
+    반환값: (썸네일 JPEG 바이트 목록 (실패하면 빈 목록), 통계)
+    """
+    from PIL import Image
+    
+    stats = {'path': image_path, 'timings': {}, 'warnings': []}
+    started = time.perf_counter()
+    started_cpu = time.thread_time()
+    thumbnails = []
+    try:
+        with Image.open(image_path) as img:
+            stats['resolution'] = img.size  # 원본 크기 (축소 디코딩 전)
+            thumbnails.append(make_thumbnail(img))
+    except Exception as e:
+        stats['warnings'].append(f"이미지 크기 조정 실패: {e}")
+    stats['timings']['resize'] = (time.perf_counter() - started, time.thread_time() - started_cpu, 1)
+    return thumbnails, stats
+
+def make_media(task):
+    """파이프라인 작업 하나 처리 (task: ('video' 또는 'image', 경로, 동영상 헤더 정보)), (썸네일 목록, 통계) 반환"""
+    kind, path, info = task
+    if kind == 'video':
+        return capture_frames(path, info=info)
+    return image_to_thumbnail(path)
 
 class VideoExcelProcessor:
-    def __init__(self, excel_file, video_folder, image_folder=None):
+    def __init__(self, excel_file, video_folder, image_folder=None, workers=1, output_backend='openpyxl',
+                 cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, incremental=False, output_file=None,
+                 checkpoint_every=0, checkpoint_interval=0, roots=None, include=None, exclude=None,
+                 report_file=None, observers=None, cancel_token=None):
+        if output_backend not in OUTPUT_BACKENDS:
+            raise ValueError(f"지원하지 않는 저장 방식: {output_backend}")
         self.excel_file = excel_file
         self.video_folder = video_folder
         self.image_folder = image_folder
+        self.workers = max(1, int(workers or 1))  # 프레임 캡처 프로세스 수 (엑셀 쓰기는 항상 메인 스레드 하나)
+        self.output_backend = output_backend
+        self.media_spool = None  # 스트리밍 저장 시 썸네일을 보관하는 스풀 파일
+        self.media_data = {}  # 내용 해시별 썸네일 바이트 (같은 이미지는 바이트 객체 하나를 같이 사용)
+        self.capture_stats = []  # 동영상별 캡처 통계 (방식, 디코딩 시간, 프레임 오차)
+        self.stats = ProcessingStats()  # 단계별/파일별 처리 시간 (process_all 반환값)
+        self.report_file = report_file  # 처리 시간 JSON 보고서 경로 (None이면 저장 안 함)
+        self.cost_model = CostModel()  # 파일별 처리 시간 예측 (긴 파일부터 작업자에 넘김)
+        self.failures = []  # 처리하지 못한 파일 [(경로, 사유)]
+        # 진행 이벤트를 받을 observer 목록 observer(ProcessingEvent) (기본값: 표준 출력에 출력)
+        self.observers = list(observers) if observers is not None else [print_event]
+        self.cancel_token = cancel_token or CancelToken()  # 다른 스레드에서 중지 요청
+        self.files_done = 0  # 진행률 계산용 처리 단위 (동영상 + 이미지 그룹, 건너뛴 파일 제외)
+        self.files_total = 0
+        self.last_progress_event = 0.0
+        self.saved = False  # 마지막 결과 파일 저장 성공 여부
+        self.thumbnail_cache = None  # 실행 간에 유지되는 썸네일 캐시 (cache_dir 지정 시)
+        if cache_dir:
+            self.thumbnail_cache = ThumbnailCache(
+                cache_dir, cache_max_bytes,
+                settings=(THUMBNAIL_SIZE, THUMBNAIL_QUALITY, CAPTURE_PLAN_VERSION, IMAGE_DECODE_VERSION))
+        self.output_file = output_file or excel_file.replace('.xlsx', '_processed.xlsx')
+        self.incremental = incremental  # 이전 결과 파일에 새로 추가/변경된 파일만 반영
+        self.manifest = ProcessingManifest(ProcessingManifest.manifest_path(self.output_file))
+        self.checkpoint_every = checkpoint_every  # 파일 N개마다 중간 저장 (0이면 사용 안 함)
+        self.checkpoint_interval = checkpoint_interval  # N초마다 중간 저장 (0이면 사용 안 함)
+        self.files_since_checkpoint = 0
+        self.last_checkpoint = time.monotonic()
+        self.job_token = None  # 중단된 작업을 이어받을 때 같은 작업인지 확인하는 토큰
+        self.resuming = False  # 중단된 체크포인트에서 이어서 처리 중인지
+        self.cancelled = False  # 처리 도중 중지되었는지 (완료되지 않은 체크포인트로 저장)
         self.workbook = None
         self.worksheets = {}  # 단지별, 유형별 워크시트 저장 {(complex, type): worksheet}
+        self.columns = {}  # 시트별 컬럼 위치 {sheet title: {컬럼명: 컬럼 번호}}
+        self.placed_images = {}  # 시트별 셀에 놓인 이미지 {sheet title: {(row, col): image}}
+        # 입력 루트 폴더 (하위 폴더까지 모두 읽음, 기본값: 현재 폴더의 입상관/횡주관)
+        self.roots = list(roots) if roots else list(PIPE_FOLDERS.values())
+        self.include = [pattern.lower() for pattern in include or []]  # 포함할 파일 패턴 (비어 있으면 전부)
+        self.exclude = [pattern.lower() for pattern in exclude or []]  # 제외할 파일/폴더 패턴
+        self.scans = None  # 입력 스캔 결과 {type: InputScan}
+        self.row_indexes = {}  # 시트별 행 인덱스 {sheet title: {'rows': {(동, 라인, 용도[, 라인상세]): row}, 'next_row': row}}
     
     def get_complex_number(self, dong):
         """동 번호에서 단지 번호 추출"""
@@ -45,267 +409,544 @@ class VideoExcelProcessor:
             template_sheet = self.workbook[f"{pipe_type}sample"]
             new_sheet = self.workbook.copy_worksheet(template_sheet)
             new_sheet.title = sheet_name
-            print(f"새 시트 생성: {sheet_name}")
+            self.log(f"새 시트 생성: {sheet_name}")
         else:
-            print(f"기존 시트 사용: {sheet_name}")
+            self.log(f"기존 시트 사용: {sheet_name}")
         
         worksheet = self.workbook[sheet_name]
         self.worksheets[key] = worksheet
+        self.resolve_columns(worksheet, pipe_type)
+        self.build_row_index(worksheet, pipe_type)
         return worksheet
 
     def load_excel(self):
         """엑셀 파일 로드 (시트는 필요할 때 동적 생성)"""
         try:
-            self.workbook = load_workbook(self.excel_file)
+            # 증분 처리거나 같은 작업이 중단된 체크포인트가 있으면 이전 결과 파일에 이어서 기록
+            source_file = self.excel_file
+            self.job_token = self.make_job_token()
+            if os.path.exists(self.output_file) and self.manifest.load():
+                # 이전 실행에서 보정한 처리 속도 이어서 사용
+                self.cost_model = CostModel(self.manifest.cost_rates)
+                if self.incremental:
+                    source_file = self.output_file
+                elif self.manifest.can_resume(self.job_token):
+                    source_file = self.output_file
+                    self.resuming = True
+                    self.log(f"중단된 작업 재개: 완료된 파일 {len(self.manifest.files)}개 건너뜀 "
+                             f"(체크포인트 {self.manifest.checkpoint.get('saved_at')})")
+            if source_file == self.excel_file:
+                # 템플릿에서 새로 시작하면 이전 기록은 사용하지 않음 (처리 속도는 유지)
+                self.manifest = ProcessingManifest(self.manifest.path)
+            
+            from openpyxl import load_workbook
+            
+            self.workbook = load_workbook(source_file)
             
             # 템플릿 시트 확인
             if "입상sample" not in self.workbook.sheetnames or "횡주sample" not in self.workbook.sheetnames:
-                print("입상sample 또는 횡주sample 시트를 찾을 수 없습니다.")
+                self.warn("입상sample 또는 횡주sample 시트를 찾을 수 없습니다.")
                 return False
             
-            print(f"엑셀 파일 로드 완료: {self.excel_file}")
+            if source_file != self.excel_file:
+                self.index_existing_images()
+                if self.incremental:
+                    self.log(f"증분 처리: 기존 결과 파일 사용 (처리된 파일 {len(self.manifest.files)}개)")
+            
+            self.log(f"엑셀 파일 로드 완료: {source_file}")
             return True
             
         except Exception as e:
-            print(f"엑셀 파일 로드 실패: {e}")
+            self.warn(f"엑셀 파일 로드 실패: {e}")
             return False
     
+    def index_existing_images(self):
+        """불러온 워크북의 이미지를 셀 위치별로 색인 (다시 저장할 수 있도록 바이트로 보관)"""
+        from openpyxl.utils.cell import coordinate_to_tuple
+        from xlsx_stream_writer import ThumbnailImage
+        
+        for worksheet in self.workbook.worksheets:
+            placed = self.placed_images.setdefault(worksheet.title, {})
+            images = []
+            for img in worksheet._images:
+                image = ThumbnailImage(img._data(), img.width, img.height, img.format)
+                image.anchor = img.anchor
+                if isinstance(img.anchor, str):
+                    row, col = coordinate_to_tuple(img.anchor)
+                else:
+                    row, col = img.anchor._from.row + 1, img.anchor._from.col + 1
+                placed[(row, col)] = image
+                images.append(image)
+            worksheet._images = images
+    
+    def replace_placed_image(self, worksheet, row, col, image):
+        """셀에 이미 놓인 이미지가 있으면 제거하고 새 이미지 위치 기록"""
+        placed = self.placed_images.setdefault(worksheet.title, {})
+        old_image = placed.get((row, col))
+        if old_image is not None and old_image in worksheet._images:
+            worksheet._images.remove(old_image)
+        placed[(row, col)] = image
+    
+    def make_job_token(self):
+        """템플릿, 작업 폴더, 캡처 설정으로 만든 작업 식별 토큰"""
+        template = ProcessingManifest.file_version(self.excel_file) or {}
+        source = repr((os.path.abspath(self.excel_file), template.get('size'), template.get('mtime_ns'),
+                       [os.path.abspath(root) for root in self.roots],
+                       self.include, self.exclude, self.incremental,
+                       THUMBNAIL_SIZE, THUMBNAIL_QUALITY, CAPTURE_PLAN_VERSION, IMAGE_DECODE_VERSION))
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+    
+    def is_up_to_date(self, path):
+        """증분 처리/재개 시 건너뛸 수 있는 (이미 반영되고 변경되지 않은) 파일인지"""
+        return (self.incremental or self.resuming) and self.manifest.is_current(path)
+    
+    def is_group_up_to_date(self, group_key, paths):
+        """증분 처리/재개 시 건너뛸 수 있는 이미지 그룹인지"""
+        return (self.incremental or self.resuming) and self.manifest.is_group_current(group_key, paths)
+    
+    def after_file_processed(self):
+        """파일 하나를 반영한 뒤 체크포인트 주기가 되었으면 중간 저장"""
+        self.files_since_checkpoint += 1
+        if ((self.checkpoint_every and self.files_since_checkpoint >= self.checkpoint_every) or
+                (self.checkpoint_interval and
+                 time.monotonic() - self.last_checkpoint >= self.checkpoint_interval)):
+            self.save_checkpoint()
+    
+    def save_checkpoint(self, complete=False):
+        """결과 파일과 매니페스트를 함께 저장 (complete=False면 다음 실행에서 이어서 처리)"""
+        self.manifest.checkpoint = {'token': self.job_token, 'complete': complete,
+                                    'saved_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        saved = self.save_excel()
+        if saved and not complete:
+            self.log(f"체크포인트 저장: 처리된 파일 {len(self.manifest.files)}개")
+        self.files_since_checkpoint = 0
+        self.last_checkpoint = time.monotonic()
+        return saved
+    
+    def add_observer(self, observer):
+        """진행 이벤트를 받을 observer 추가"""
+        self.observers.append(observer)
+    
+    def emit(self, event_type, message=None, **fields):
+        """observer들에게 이벤트 전달"""
+        if not self.observers:
+            return
+        event = ProcessingEvent(event_type, message, **fields)
+        for observer in self.observers:
+            observer(event)
+    
+    def log(self, message):
+        """일반 메시지 이벤트"""
+        self.emit(EVENT_LOG, message)
+    
+    def warn(self, message, path=None):
+        """경고/오류 메시지 이벤트"""
+        self.emit(EVENT_WARNING, message, path=path)
+    
+    def advance(self, count=1):
+        """진행 수를 늘리고 진행률 이벤트 전달 (PROGRESS_EVENT_INTERVAL마다 한 번, 시작과 끝은 항상)"""
+        self.files_done += count
+        now = time.monotonic()
+        if (count == 0 or self.files_done >= self.files_total or
+                now - self.last_progress_event >= PROGRESS_EVENT_INTERVAL):
+            self.last_progress_event = now
+            self.emit(EVENT_PROGRESS, done=self.files_done, total=self.files_total)
+    
+    def start_file(self, kind, path, count=None):
+        """파일 처리 시작 이벤트"""
+        self.emit(EVENT_FILE_STARTED, path=path, kind=kind, done=self.files_done + 1, total=self.files_total,
+                  count=count)
+    
+    def finish_file(self, kind, path, reason=None):
+        """파일 처리 끝 이벤트 (reason이 있으면 실패로 기록, 커맨드라인 종료 코드와 요약에 사용)"""
+        if reason:
+            self.failures.append((path, reason))
+        entry = self.stats.files.get(path)
+        self.emit(EVENT_FILE_FINISHED, path=path, kind=kind, ok=reason is None, reason=reason,
+                  data=dict(entry['stages']) if entry else {})
+    
+    def image_group_key(self, pipe_type, key):
+        """매니페스트에 쓰는 이미지 그룹 키"""
+        return '|'.join((PIPE_FOLDERS[pipe_type],) + tuple(key))
+    
     def extract_video_info(self, filename, pipe_type):
         """동영상 파일명에서 정보 추출"""
         # (이상배관) 부분 제거
-        clean_filename = re.sub(r'\(이상배관\)', '', filename)
+        clean_filename = ISSUE_MARK_PATTERN.sub('', filename)
         
-        if pipe_type == '입상':
-            # 예: "1102동 4호 입상관 세탁.mp4"
-            pattern = r'(\d+동)\s+(\d+호)\s+입상관\s+(.+)\.mp4'
-            match = re.match(pattern, clean_filename)
-            
-            if match:
-                dong = match.group(1)  # "1102동"
-                ho = match.group(2)    # "4호"  
-                usage = match.group(3) # "세탁"
-                
-                # 단지 구분
-                complex_num = self.get_complex_number(dong)
-                
-                return {
-                    'dong': dong,
-                    'ho': ho,
-                    'usage': usage,
-                    'complex': complex_num,
-                    'type': '입상'
-                }
-        
-        elif pipe_type == '횡주':
-            # 예: "1101동 1-1호 횡주관 배수.mp4"
-            pattern = r'(\d+동)\s+(\d+-\d+호)\s+횡주관\s+(.+)\.mp4'
-            match = re.match(pattern, clean_filename)
-            
-            if match:
-                dong = match.group(1)      # "1101동"
-                full_ho = match.group(2)   # "1-1호"
-                usage = match.group(3)     # "배수"
-                
-                # 1-1호에서 1호와 1-1로 분리
-                ho_pattern = r'(\d+)-(\d+)호'
-                ho_match = re.match(ho_pattern, full_ho)
-                if ho_match:
-                    ho = f"{ho_match.group(1)}호"  # "1호"
-                    line_detail = f"{ho_match.group(1)}-{ho_match.group(2)}"  # "1-1"
-                else:
-                    print(f"호수 패턴 불일치: {full_ho}")
-                    return None
-                
-                # 단지 구분
-                complex_num = self.get_complex_number(dong)
-                
-                return {
-                    'dong': dong,
-                    'ho': ho,
-                    'line_detail': line_detail,
-                    'usage': usage,
-                    'complex': complex_num,
-                    'type': '횡주'
-                }
-        
-        print(f"파일명 패턴 불일치: {filename}")
+        match = VIDEO_PATTERNS[pipe_type].match(clean_filename) if pipe_type in VIDEO_PATTERNS else None
+        if match:
+            dong = match.group(1)   # "1102동"
+            usage = match.group(3)  # "세탁"
+            info = {'dong': dong, 'usage': usage, 'complex': self.get_complex_number(dong), 'type': pipe_type}
+            if self.split_ho(match.group(2), pipe_type, info):
+                return info
+            return None
+        
+        self.warn(f"파일명 패턴 불일치: {filename}")
         return None
     
     def extract_image_info(self, filename, pipe_type):
         """이미지 파일명에서 정보 추출"""
+        match = IMAGE_PATTERNS[pipe_type].match(filename) if pipe_type in IMAGE_PATTERNS else None
+        if match:
+            dong = match.group(1)   # "1102동"
+            info = {
+                'dong': dong,
+                'usage': match.group(3),     # "세탁"
+                'issue': match.group(4),     # "이물질"
+                'location': match.group(5),  # "옥상"
+                'complex': self.get_complex_number(dong),
+                'type': pipe_type,
+            }
+            if self.split_ho(match.group(2), pipe_type, info):
+                return info
+            return None
+        
+        self.warn(f"이미지 파일명 패턴 불일치: {filename}")
+        return None
+    
+    def split_ho(self, full_ho, pipe_type, info):
+        """호수 정보를 info에 기록 (횡주는 "1-1호"를 "1호"와 라인 상세 "1-1"로 분리)"""
         if pipe_type == '입상':
-            # 예: "1102동 4호 입상관 세탁_이물질_옥상.jpg"
-            pattern = r'(\d+동)\s+(\d+호)\s+입상관\s+(.+?)_(.+?)_(.+?)\.(jpg|jpeg|png)'
-            match = re.match(pattern, filename, re.IGNORECASE)
+            info['ho'] = full_ho  # "4호"
+            return True
+        
+        ho_match = HO_DETAIL_PATTERN.match(full_ho)
+        if not ho_match:
+            self.warn(f"호수 패턴 불일치: {full_ho}")
+            return False
+        info['ho'] = f"{ho_match.group(1)}호"  # "1호"
+        info['line_detail'] = f"{ho_match.group(1)}-{ho_match.group(2)}"  # "1-1"
+        return True
+    
+    def detect_pipe_type(self, name):
+        """폴더 이름이나 파일명에서 배관 유형 판단 (알 수 없으면 None)"""
+        for pipe_type, folder_name in PIPE_FOLDERS.items():
+            if folder_name in name:
+                return pipe_type
+        return None
+    
+    def matches_patterns(self, rel_path, patterns):
+        """상대 경로나 이름이 패턴 중 하나와 일치하는지 (대소문자 구분 없음)"""
+        rel_path = rel_path.lower()
+        name = rel_path.rsplit('/', 1)[-1]
+        return any(fnmatch.fnmatchcase(rel_path, pattern) or fnmatch.fnmatchcase(name, pattern)
+                   for pattern in patterns)
+    
+    def walk_files(self, root):
+        """루트 아래 파일을 scandir 한 번씩으로 순회 (이름순, 폴더 이름에서 배관 유형 상속)"""
+        root_type = self.detect_pipe_type(os.path.basename(os.path.abspath(root)))
+        stack = [(root, '', root_type)]
+        while stack:
+            folder_path, rel_folder, folder_type = stack.pop()
+            try:
+                with os.scandir(folder_path) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                self.warn(f"폴더를 읽을 수 없습니다: {folder_path} ({e})")
+                continue
             
-            if match:
-                dong = match.group(1)    # "1102동"
-                ho = match.group(2)      # "4호"
-                usage = match.group(3)   # "세탁"
-                issue = match.group(4)   # "이물질"
-                location = match.group(5) # "옥상"
-                
-                # 단지 구분
-                complex_num = self.get_complex_number(dong)
-                
-                return {
-                    'dong': dong,
-                    'ho': ho,
-                    'usage': usage,
-                    'issue': issue,
-                    'location': location,
-                    'complex': complex_num,
-                    'type': '입상'
-                }
-        
-        elif pipe_type == '횡주':
-            # 예: "1101동 1-1호 횡주관 배수_이물질_옥상.jpg"
-            pattern = r'(\d+동)\s+(\d+-\d+호)\s+횡주관\s+(.+?)_(.+?)_(.+?)\.(jpg|jpeg|png)'
-            match = re.match(pattern, filename, re.IGNORECASE)
+            subfolders = []
+            for entry in entries:
+                rel_path = f"{rel_folder}/{entry.name}" if rel_folder else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    # 제외된 폴더는 내려가지 않음
+                    if not self.matches_patterns(rel_path, self.exclude):
+                        subfolders.append((entry.path, rel_path, self.detect_pipe_type(entry.name) or folder_type))
+                elif entry.is_file():
+                    yield entry, rel_path, folder_type
             
-            if match:
-                dong = match.group(1)      # "1101동"
-                full_ho = match.group(2)   # "1-1호"
-                usage = match.group(3)     # "배수"
-                issue = match.group(4)     # "이물질"
-                location = match.group(5)  # "옥상"
-                
-                # 1-1호에서 1호와 1-1로 분리
-                ho_pattern = r'(\d+)-(\d+)호'
-                ho_match = re.match(ho_pattern, full_ho)
-                if ho_match:
-                    ho = f"{ho_match.group(1)}호"  # "1호"
-                    line_detail = f"{ho_match.group(1)}-{ho_match.group(2)}"  # "1-1"
-                else:
-                    print(f"호수 패턴 불일치: {full_ho}")
-                    return None
-                
-                # 단지 구분
-                complex_num = self.get_complex_number(dong)
-                
-                return {
-                    'dong': dong,
-                    'ho': ho,
-                    'line_detail': line_detail,
-                    'usage': usage,
-                    'issue': issue,
-                    'location': location,
-                    'complex': complex_num,
-                    'type': '횡주'
-                }
-        
-        print(f"이미지 파일명 패턴 불일치: {filename}")
-        return None
+            # 하위 폴더도 이름순으로 방문
+            stack.extend(reversed(subfolders))
     
-    def capture_video_frames(self, video_path, output_dir):
-        """동영상에서 3개 프레임 캡처"""
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print(f"동영상 열기 실패: {video_path}")
-            return []
-        
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        duration = total_frames / fps
-        
-        # 캡처할 시간 계산
-        times = [2.0, duration/2, max(2.0, duration-2.0)]
-        captured_files = []
+    def scan_inputs(self):
+        """입력 루트를 한 번만 읽어 배관 유형별 처리 목록을 만듦 (이후 호출은 같은 결과 재사용)"""
+        if self.scans is not None:
+            return self.scans
         
-        # 파일명용 해시 생성
-        file_hash = hashlib.md5(video_path.encode()).hexdigest()[:8]
-        
-        for i, time_sec in enumerate(times):
-            frame_number = int(time_sec * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        with self.stats.measure('scan'):
+            self.scans = self.scan_roots()
+        return self.scans
+    
+    def scan_roots(self):
+        """입력 루트 전체를 순회해 배관 유형별 InputScan 생성"""
+        scans = {pipe_type: InputScan(pipe_type) for pipe_type in PIPE_FOLDERS}
+        seen = set()  # 루트가 겹쳐도 같은 파일은 한 번만
+        for root in self.roots:
+            if not os.path.isdir(root):
+                self.warn(f"폴더를 찾을 수 없습니다: {root}")
+                continue
             
-            ret, frame = cap.read()
-            if ret:
-                suffix = ['start', 'middle', 'end'][i]
-                output_file = os.path.join(output_dir, f"capture_{file_hash}_{suffix}.jpg")
+            for entry, rel_path, folder_type in self.walk_files(root):
+                filename = entry.name
+                extension = os.path.splitext(filename)[1].lower()
+                if extension not in VIDEO_EXTENSIONS and extension not in IMAGE_EXTENSIONS:
+                    continue
+                if self.include and not self.matches_patterns(rel_path, self.include):
+                    continue
+                if self.matches_patterns(rel_path, self.exclude):
+                    continue
+                real_path = os.path.normcase(os.path.abspath(entry.path))
+                if real_path in seen:
+                    continue
+                seen.add(real_path)
                 
-                # PIL을 사용해서 한글 경로 문제 해결
-                try:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(frame_rgb)
-                    pil_image.save(output_file, 'JPEG', quality=90)
-                    captured_files.append(output_file)
-                    print(f"캡처 완료: {output_file}")
-                except Exception as e:
-                    print(f"프레임 저장 실패: {e}")
-            else:
-                print(f"프레임 캡처 실패: {time_sec}초")
+                # 배관 유형은 폴더 구조 우선, 없으면 파일명에서
+                pipe_type = folder_type or self.detect_pipe_type(filename)
+                if not pipe_type:
+                    self.warn(f"배관 유형을 알 수 없는 파일: {entry.path}")
+                    continue
+                scan = scans[pipe_type]
+                
+                if extension in VIDEO_EXTENSIONS:
+                    with self.stats.measure('parse'):
+                        info = self.extract_video_info(filename, pipe_type)
+                    if info:
+                        scan.videos.append(FileJob('video', pipe_type, entry.path, entry.stat().st_size, info))
+                    else:
+                        scan.invalid_videos.append(entry.path)
+                else:
+                    with self.stats.measure('parse'):
+                        info = self.extract_image_info(filename, pipe_type)
+                    if info:
+                        job = FileJob('image', pipe_type, entry.path, entry.stat().st_size, info)
+                        scan.image_groups.setdefault(job.row_key, []).append(job)
+        return scans
+    
+    def iter_media(self, tasks):
+        """[(종류, FileJob)] 목록의 썸네일 목록을 입력 순서대로 반환 (캐시에 있으면 디코딩 생략)
         
-        cap.release()
-        return captured_files
+        디코딩/썸네일 변환은 작업자(workers가 1이면 스레드 하나, 그보다 크면 프로세스 풀)에서 미리 진행하고
+        엑셀 기록은 호출한 스레드 하나가 맡음. 작업자에 넘겨 두는 파일은 workers * PIPELINE_DEPTH개로 제한함.
+        작업자가 여러 개면 기록할 차례인 파일을 먼저 넘기고 나머지 자리는 전체 목록에서 예상 처리 시간이 긴 것부터
+        채움 (결과는 입력 순서대로 돌려주므로 엑셀 배치는 넘긴 순서와 관계없이 같음).
+        기록을 기다리는 썸네일이 MAX_BUFFERED_BYTES를 넘으면 기록할 차례에 가까운 파일부터 넘김.
+        결과를 기다리는 동안 중지 요청이 오면 None을 돌려주고 끝냄.
+        """
+        from concurrent.futures import wait, FIRST_COMPLETED
+        
+        cache = self.thumbnail_cache
+        depth = self.workers * PIPELINE_DEPTH
+        longest_first = self.workers > 1
+        tasks = list(tasks)
+        queue = DispatchQueue(self.cost_model, tasks)
+        ready = {}    # 기록을 기다리는 결과 {위치: 썸네일 목록}
+        buffered = 0  # ready에 있는 썸네일 바이트 수
+        running = {}  # 작업자가 처리 중인 파일 {future: 위치}
+        executor = None
+        try:
+            for index in range(len(tasks)):
+                while index not in ready:
+                    # 작업자에 빈 자리가 있으면 다음 파일을 넘김
+                    while len(running) < depth and queue:
+                        next_index = queue.pop(index, longest_first and buffered < MAX_BUFFERED_BYTES)
+                        kind, job = tasks[next_index]
+                        cached = cache.get(job.path, kind) if cache else None
+                        if cached is not None:
+                            ready[next_index] = cached
+                            buffered += sum(map(len, cached))
+                            continue
+                        if executor is None:
+                            executor = self.make_executor()
+                        running[executor.submit(make_media, (kind, job.path, job.media_info))] = next_index
+                    if index in ready:
+                        break
+                    done, _ = wait(running, timeout=CANCEL_CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        done_index = running.pop(future)
+                        ready[done_index] = self.collect_media(*tasks[done_index], future)
+                        buffered += sum(map(len, ready[done_index]))
+                    if self.cancel_token.cancelled:
+                        yield None
+                        return
+                thumbnails = ready.pop(index)
+                buffered -= sum(map(len, thumbnails))
+                yield thumbnails
+        finally:
+            if executor is not None:
+                # 중지 요청이면 처리 중인 파일이 끝나기를 기다리지 않음
+                executor.shutdown(wait=not self.cancel_token.cancelled, cancel_futures=True)
+    
+    def collect_media(self, kind, job, future):
+        """작업자 결과를 받아 통계/캐시/처리 시간 예측에 반영하고 썸네일 목록 반환"""
+        try:
+            thumbnails, stats = future.result()
+        except Exception as e:
+            self.warn(f"썸네일 생성 실패: {job.filename} ({e})", job.path)
+            return []
+        self.record_media_stats(kind, stats)
+        # 작업자에서 측정한 시간(동영상 열기, 디코딩, 썸네일 변환)과 예측값 비교
+        seconds = sum(wall for wall, _, _ in stats['timings'].values())
+        estimated = self.cost_model.observe(kind, job, seconds)
+        self.stats.note_file(job.path, estimated_seconds=round(estimated, 4))
+        if self.thumbnail_cache and thumbnails:
+            self.put_cached_thumbnails(job.path, kind, thumbnails)
+        return thumbnails
+    
+    def put_cached_thumbnails(self, path, kind, thumbnails):
+        """썸네일을 캐시에 저장 (실패해도 처리는 계속하고 경고만 알림)"""
+        try:
+            self.thumbnail_cache.put(path, kind, thumbnails)
+        except OSError as e:
+            self.warn(f"썸네일 캐시 저장 실패: {e}", path)
     
-    def resize_image_for_excel(self, image_path, width=102, height=96):
-        """엑셀에 삽입할 이미지 크기 조정"""
+    def make_executor(self):
+        """디코딩/썸네일 변환 작업자 (workers가 1이면 스레드 하나, 그보다 크면 프로세스 풀)"""
+        if self.workers <= 1:
+            from concurrent.futures import ThreadPoolExecutor
+            # OpenCV/PIL은 디코딩 중 GIL을 놓으므로 스레드 하나로도 엑셀 기록과 겹쳐서 실행됨
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix='media')
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=self.workers)
+    
+    def record_media_stats(self, kind, stats):
+        """작업자가 보낸 썸네일 생성 통계 기록"""
+        if kind == 'video':
+            self.record_capture_stats(stats)
+            return
+        self.stats.record_capture(stats)
+        for warning in stats.get('warnings', ()):
+            self.warn(warning, stats['path'])
+    
+    def record_capture_stats(self, stats):
+        """동영상별 캡처 통계 기록"""
+        self.capture_stats.append(stats)
+        self.stats.record_capture(stats)
+        for warning in stats.get('warnings', ()):
+            self.warn(warning, stats['path'])
+        if stats['mode']:
+            max_error = max((abs(e) for e in stats['frame_errors']), default=0)
+            self.log(f"캡처 통계: {os.path.basename(stats['path'])} - {stats['mode']} "
+                     f"(grab {stats['grabbed']}, seek {stats['seeks']}), "
+                     f"디코딩 {stats['decode_time']:.2f}초, 프레임 오차 최대 {max_error}")
+    
+    def capture_summary(self):
+        """전체 동영상 캡처 통계 요약 문자열"""
+        captured = [stats for stats in self.capture_stats if stats['mode']]
+        if not captured:
+            return "캡처한 동영상이 없습니다."
+        total_time = sum(stats['decode_time'] for stats in captured)
+        errors = [e for stats in captured for e in stats['frame_errors']]
+        exact = sum(1 for e in errors if e == 0)
+        modes = {}
+        for stats in captured:
+            modes[stats['mode']] = modes.get(stats['mode'], 0) + 1
+        mode_text = ', '.join(f"{mode} {count}개" for mode, count in sorted(modes.items()))
+        return (f"캡처 요약: 동영상 {len(captured)}개 ({mode_text}), "
+                f"디코딩 합계 {total_time:.2f}초 / 평균 {total_time / len(captured):.2f}초, "
+                f"타임스탬프가 맞는 프레임 {exact}/{len(errors)}")
+    
+    def resize_image_for_excel(self, image_path, width=THUMBNAIL_SIZE[0], height=THUMBNAIL_SIZE[1]):
+        """엑셀에 삽입할 이미지 크기 조정 (썸네일 JPEG 바이트 반환, 실패 시 None)"""
+        from PIL import Image
+        
         try:
             with Image.open(image_path) as img:
-                # 비율 무시하고 정확한 크기로 조정
-                img_resized = img.resize((width, height), Image.Resampling.LANCZOS)
-                
-                # 임시 파일로 저장
-                temp_file = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-                img_resized.save(temp_file.name, 'JPEG', quality=70)
-                return temp_file.name
+                return make_thumbnail(img, width, height)
         except Exception as e:
-            print(f"이미지 크기 조정 실패: {e}")
-            return image_path
+            self.warn(f"이미지 크기 조정 실패: {e}")
+            return None
     
     def find_column_by_name(self, worksheet, column_name):
         """컬럼명으로 컬럼 번호 찾기"""
-        # 헤더 행은 3번째 행
-        header_row = 3
         for col in range(1, worksheet.max_column + 1):
-            cell_value = str(worksheet.cell(header_row, col).value or '').strip()
+            cell_value = str(worksheet.cell(HEADER_ROW, col).value or '').strip()
             if column_name == cell_value:
                 return col
         return None
 
-    def find_or_create_row(self, worksheet, pipe_type, dong, ho, usage, line_detail=None):
-        """해당하는 행을 찾거나 새로 생성"""
-        # 헤더 행은 3번째 행
-        header_row = 3
+    def resolve_columns(self, worksheet, pipe_type):
+        """헤더 행을 한 번만 읽어 시트의 컬럼 위치를 캐시"""
+        headers = {}
+        for col, value in enumerate(next(worksheet.iter_rows(min_row=HEADER_ROW, max_row=HEADER_ROW,
+                                                            values_only=True), ()), 1):
+            headers.setdefault(str(value or '').strip(), col)
         
-        # 컬럼 위치 찾기
-        dong_col = self.find_column_by_name(worksheet, '동')
-        ho_col = self.find_column_by_name(worksheet, '라인')
+        columns = {}
+        missing = []
+        for name, default_col in COLUMN_SCHEMA[pipe_type].items():
+            col = headers.get(name) or default_col
+            if col:
+                columns[name] = col
+            else:
+                missing.append(name)
         
-        if pipe_type == '입상':
-            usage_col = self.find_column_by_name(worksheet, '용도')
-            pipe_col = self.find_column_by_name(worksheet, '배관경')
-        else:  # 횡주
-            usage_col = 4  # 횡주는 용도가 4번째 컬럼
-            pipe_col = 5   # 횡주는 배관경이 5번째 컬럼
-            line_detail_col = 3  # 횡주는 3번째 컬럼에 라인 상세 (1-1)
+        if missing:
+            self.warn(f"[{worksheet.title}] 컬럼을 찾을 수 없습니다: {', '.join(missing)}")
+        
+        self.columns[worksheet.title] = columns
+        return columns
+
+    def get_columns(self, worksheet, pipe_type):
+        """캐시된 컬럼 위치 반환 (없으면 헤더에서 찾음)"""
+        columns = self.columns.get(worksheet.title)
+        if columns is None:
+            columns = self.resolve_columns(worksheet, pipe_type)
+        return columns
+
+    def get_row_key_columns(self, worksheet, pipe_type):
+        """행 매칭에 쓰는 컬럼 번호 (동, 라인, 용도, 배관경, 라인상세)"""
+        columns = self.get_columns(worksheet, pipe_type)
+        return (columns.get('동'), columns.get('라인'), columns.get('용도'),
+                columns.get('배관경'), columns.get('라인상세'))
+
+    def build_row_index(self, worksheet, pipe_type):
+        """워크시트의 기존 행을 (동, 라인, 용도[, 라인상세]) 키로 한 번만 색인"""
+        header_row = HEADER_ROW
+        dong_col, ho_col, usage_col, pipe_col, line_detail_col = self.get_row_key_columns(worksheet, pipe_type)
         
+        rows = {}
+        index = {'rows': rows, 'next_row': None}
+        self.row_indexes[worksheet.title] = index
+        if not all([dong_col, ho_col, usage_col, pipe_col]):
+            return index
+        
+        def text(values, col):
+            return str(values[col - 1] or '').strip()
+        
+        max_col = max(dong_col, ho_col, usage_col, line_detail_col or 0)
+        row = header_row
+        for row, values in enumerate(worksheet.iter_rows(min_row=header_row + 1, max_col=max_col,
+                                                         values_only=True), header_row + 1):
+            # 같은 키가 여러 행에 있으면 선형 탐색과 같이 첫 번째 행을 사용
+            key = (text(values, dong_col), text(values, ho_col), text(values, usage_col))
+            rows.setdefault(key, row)
+            if line_detail_col:
+                rows.setdefault(key + (text(values, line_detail_col),), row)
+            
+            # 동 컬럼이 비어있는 첫 행이 새 행 위치
+            if index['next_row'] is None and not values[dong_col - 1]:
+                index['next_row'] = row
+        
+        if index['next_row'] is None:
+            index['next_row'] = row + 1
+        return index
+
+    def find_or_create_row(self, worksheet, pipe_type, dong, ho, usage, line_detail=None):
+        """해당하는 행을 찾거나 새로 생성"""
+        dong_col, ho_col, usage_col, pipe_col, line_detail_col = self.get_row_key_columns(worksheet, pipe_type)
+        
+        # 필수 컬럼 누락은 resolve_columns에서 시트당 한 번만 보고함
         if not all([dong_col, ho_col, usage_col, pipe_col]):
-            print("필수 컬럼을 찾을 수 없습니다.")
             return None
         
+        index = self.row_indexes.get(worksheet.title)
+        if index is None:
+            index = self.build_row_index(worksheet, pipe_type)
+        
         # 기존 행에서 매칭되는 행 찾기
-        for row in range(header_row + 1, worksheet.max_row + 1):
-            dong_value = str(worksheet.cell(row, dong_col).value or '').strip()
-            ho_value = str(worksheet.cell(row, ho_col).value or '').strip()
-            usage_value = str(worksheet.cell(row, usage_col).value or '').strip()
-            
-            if pipe_type == '횡주' and line_detail:
-                line_detail_value = str(worksheet.cell(row, line_detail_col).value or '').strip()
-                if (dong == dong_value and ho == ho_value and usage == usage_value 
-                    and line_detail == line_detail_value):
-                    print(f"기존 행 찾음: 행 {row}")
-                    return row
-            else:
-                if dong == dong_value and ho == ho_value and usage == usage_value:
-                    print(f"기존 행 찾음: 행 {row}")
-                    return row
+        if pipe_type == '횡주' and line_detail:
+            key = (dong, ho, usage, line_detail)
+        else:
+            key = (dong, ho, usage)
+        row = index['rows'].get(key)
+        if row:
+            self.log(f"기존 행 찾음: 행 {row}")
+            return row
         
-        # 새 행 생성 (빈 행 찾기)
-        new_row = header_row + 1
-        while worksheet.cell(new_row, dong_col).value:
-            new_row += 1
+        # 새 행 생성 (빈 행 위치)
+        new_row = index['next_row']
         
         # 데이터 입력
         worksheet.cell(new_row, dong_col).value = dong
@@ -315,20 +956,69 @@ class VideoExcelProcessor:
         
         if pipe_type == '횡주' and line_detail:
             worksheet.cell(new_row, line_detail_col).value = line_detail
-            print(f"새 행 생성: 행 {new_row} - {dong} {ho} ({line_detail}) {usage}")
+            self.log(f"새 행 생성: 행 {new_row} - {dong} {ho} ({line_detail}) {usage}")
         else:
-            print(f"새 행 생성: 행 {new_row} - {dong} {ho} {usage}")
+            self.log(f"새 행 생성: 행 {new_row} - {dong} {ho} {usage}")
+        
+        # 인덱스 갱신 (빈 행이 기존 행보다 위에 있을 수 있으므로 더 앞선 행을 유지)
+        rows = index['rows']
+        keys = [(dong, ho, usage)]
+        if line_detail_col:
+            keys.append(keys[0] + (str(worksheet.cell(new_row, line_detail_col).value or '').strip(),))
+        for key in keys:
+            rows[key] = min(rows.get(key, new_row), new_row)
+        next_row = new_row + 1
+        while worksheet.cell(next_row, dong_col).value:
+            next_row += 1
+        index['next_row'] = next_row
         
         return new_row
 
-    def insert_image_to_cell(self, worksheet, image_path, row, col):
-        """엑셀 셀에 이미지 삽입"""
+    def locate_row(self, job):
+        """작업 파일이 들어갈 워크시트와 행 (행이 없으면 생성)"""
+        with self.stats.measure('row_lookup', job.path):
+            worksheet = self.get_or_create_worksheet(job.complex, job.pipe_type)
+            row = self.find_or_create_row(worksheet, job.pipe_type, job.dong, job.ho, job.usage, job.line_detail)
+        return worksheet, row
+    
+    def load_image_thumbnail(self, image_path):
+        """이미지 파일의 썸네일 (캐시에 있으면 크기 조정 생략)"""
+        cache = self.thumbnail_cache
+        thumbnails = cache.get(image_path, 'image') if cache else None
+        if thumbnails:
+            return thumbnails[0]
+        with self.stats.measure('resize', image_path):
+            thumbnail = self.resize_image_for_excel(image_path)
+        if cache and thumbnail:
+            self.put_cached_thumbnails(image_path, 'image', [thumbnail])
+        return thumbnail
+
+    def make_excel_image(self, data):
+        """썸네일 바이트로 엑셀 이미지 객체 생성 (스트리밍 저장이면 스풀 파일에 보관)
+        
+        내용 해시를 같이 넘겨 저장할 때 같은 이미지는 미디어 파일 하나로 저장되게 함
+        """
+        from xlsx_stream_writer import MediaSpool, SpooledImage, ThumbnailImage, media_digest
+        
+        digest = media_digest(data)
+        if self.output_backend == 'streaming':
+            if self.media_spool is None:
+                self.media_spool = MediaSpool()
+            return SpooledImage(self.media_spool, data, *THUMBNAIL_SIZE, digest=digest)
+        data = self.media_data.setdefault(digest, data)
+        return ThumbnailImage(data, *THUMBNAIL_SIZE, digest=digest)
+
+    def insert_image_to_cell(self, worksheet, image, row, col):
+        """엑셀 셀에 이미지 삽입 (image: 썸네일 JPEG 바이트 또는 이미지 파일 경로)"""
         try:
-            # 이미지 크기 조정
-            resized_image = self.resize_image_for_excel(image_path)
+            # 파일 경로면 썸네일로 변환
+            if not isinstance(image, bytes):
+                image = self.load_image_thumbnail(image)
+                if image is None:
+                    return False
             
             # 엑셀에 이미지 삽입
-            img = OpenpyxlImage(resized_image)
+            img = self.make_excel_image(image)
             
             # 셀 위치 계산
             cell_address = worksheet.cell(row, col).coordinate
@@ -338,200 +1028,375 @@ class VideoExcelProcessor:
             worksheet.row_dimensions[row].height = 74
             worksheet.column_dimensions[worksheet.cell(row, col).column_letter].width = 13
             
+            self.replace_placed_image(worksheet, row, col, img)
             worksheet.add_image(img)
-            
-            print(f"이미지 삽입 완료: {cell_address}")
             return True
         except Exception as e:
-            print(f"이미지 삽입 실패: {e}")
+            self.warn(f"이미지 삽입 실패: {e}")
             return False
 
-    def process_folder(self, folder_path, pipe_type):
-        """특정 폴더의 동영상과 이미지 처리"""
-        if not os.path.exists(folder_path):
-            print(f"폴더를 찾을 수 없습니다: {folder_path}")
-            return
+    def plan_scan(self, scan):
+        """배관 유형 하나의 처리 목록 (증분 처리/재개 시 건너뛸 파일 제외), (목록, 건너뛴 수) 반환"""
+        entries = []
+        skipped = 0
         
-        print(f"\n=== {pipe_type} 파일 처리 중 ===")
-        
-        # 캡처 이미지 저장할 폴더 생성
-        capture_dir = os.path.join(os.getcwd(), 'captured_images')
-        os.makedirs(capture_dir, exist_ok=True)
-        
-        # 이미지 파일 그룹핑 (동, 호, 용도별로)
-        image_groups = {}
-        all_files = os.listdir(folder_path)
+        # 동영상 파일 (증분 처리면 새로 추가/변경된 것만)
+        for job in scan.videos:
+            if self.is_up_to_date(job.path):
+                skipped += 1
+                continue
+            # 헤더만 읽어 캡처 시점 계획에 쓸 정보를 얻고, 손상된 파일은 작업자에 넘기지 않음
+            try:
+                with self.stats.measure('probe', job.path):
+                    job.media_info = probe_video(job.path)
+            except ProbeError as e:
+                entries.append(('corrupt', job, str(e)))
+                continue
+            if job.media_info:
+                info = job.media_info
+                self.stats.note_file(job.path, duration=round(info.duration, 2), codec=info.codec)
+            entries.append(('video', job))
+        for path in scan.invalid_videos:
+            entries.append(('invalid', path))
         
-        # 이미지 파일들을 먼저 그룹핑
-        for filename in all_files:
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                image_info = self.extract_image_info(filename, pipe_type)
-                if image_info:
-                    if pipe_type == '횡주':
-                        key = (image_info['dong'], image_info['ho'], image_info['usage'], image_info['line_detail'])
-                    else:
-                        key = (image_info['dong'], image_info['ho'], image_info['usage'])
-                    
-                    if key not in image_groups:
-                        image_groups[key] = []
-                    image_groups[key].append((filename, image_info))
-        
-        # 동영상 파일 처리
-        for filename in all_files:
-            if filename.endswith('.mp4'):
-                video_info = self.extract_video_info(filename, pipe_type)
-                if not video_info:
-                    continue
-                
-                print(f"동영상 처리 중: {filename}")
+        # 이미지 파일은 그룹별로 첫 번째만 (증분 처리면 그룹 구성이나 파일이 바뀐 경우만)
+        for key, group in scan.image_groups.items():
+            group_key = self.image_group_key(scan.pipe_type, key)
+            group_paths = [job.path for job in group]
+            if self.is_group_up_to_date(group_key, group_paths):
+                skipped += 1
+                continue
+            entries.append(('image', group[0], len(group), group_key, group_paths))
+        return entries, skipped
+    
+    def process_entries(self, entries):
+        """처리 목록을 순서대로 엑셀에 반영 (캡처는 병렬, 행 찾기와 삽입은 순서대로)"""
+        media = self.iter_media([entry[:2] for entry in entries if entry[0] in ('video', 'image')])
+        try:
+            for entry in entries:
+                # 작업자에서 미리 진행된 썸네일을 순서대로 받음 (기다리는 동안 중지되면 None)
+                thumbnails = next(media) if entry[0] in ('video', 'image') else None
                 
-                # 해당 단지, 유형 워크시트 선택
-                worksheet = self.get_or_create_worksheet(video_info['complex'], pipe_type)
+                # 중지 요청 확인 (파일 사이마다, 결과를 기다리는 동안에도)
+                if self.cancel_token.cancelled:
+                    self.cancelled = True
+                    self.advance(0)  # 간격 조절로 보내지 않은 마지막 진행 수 전달
+                    self.log("처리가 중지되었습니다. 다시 시작하면 중지된 위치부터 이어서 처리합니다.")
+                    return
                 
-                # 해당하는 행 찾거나 생성
-                if pipe_type == '횡주':
-                    row = self.find_or_create_row(worksheet, pipe_type, video_info['dong'], 
-                                                video_info['ho'], video_info['usage'], 
-                                                video_info['line_detail'])
+                if entry[0] == 'invalid':
+                    self.start_file('invalid', entry[1])
+                    self.finish_file('invalid', entry[1], '파일명 패턴 불일치')
+                elif entry[0] == 'corrupt':
+                    self.start_file('video', entry[1].path)
+                    self.finish_file('video', entry[1].path, entry[2])
+                elif entry[0] == 'video':
+                    self.process_video(entry[1], thumbnails)
                 else:
-                    row = self.find_or_create_row(worksheet, pipe_type, video_info['dong'], 
-                                                video_info['ho'], video_info['usage'])
-                if not row:
-                    continue
-                
-                # 동영상 캡처
-                video_path = os.path.join(folder_path, filename)
-                captured_files = self.capture_video_frames(video_path, capture_dir)
-                
-                if len(captured_files) >= 3:
-                    # 컬럼 번호 찾기
-                    if pipe_type == '입상':
-                        position_col = self.find_column_by_name(worksheet, '위치사진')
-                        check1_col = self.find_column_by_name(worksheet, '점검사진1')
-                        check2_col = self.find_column_by_name(worksheet, '점검사진2')
-                        
-                        # 이미지를 엑셀에 삽입
-                        if position_col:
-                            self.insert_image_to_cell(worksheet, captured_files[0], row, position_col)
-                        if check1_col:
-                            self.insert_image_to_cell(worksheet, captured_files[1], row, check1_col)
-                        if check2_col:
-                            self.insert_image_to_cell(worksheet, captured_files[2], row, check2_col)
-                    
-                    else:  # 횡주
-                        position_col = self.find_column_by_name(worksheet, '위치사진')
-                        # 횡주는 점검사진이 2개 (컬럼 7, 8)
-                        check1_col = 7
-                        check2_col = 8
-                        
-                        # 이미지를 엑셀에 삽입
-                        if position_col:
-                            self.insert_image_to_cell(worksheet, captured_files[0], row, position_col)
-                        self.insert_image_to_cell(worksheet, captured_files[1], row, check1_col)
-                        self.insert_image_to_cell(worksheet, captured_files[2], row, check2_col)
-        
-        # 이미지 파일 처리 (그룹별로 첫 번째만)
-        processed_groups = set()
-        for key, files_info in image_groups.items():
-            if key in processed_groups:
-                continue
-            
-            # 첫 번째 파일만 처리
-            filename, image_info = files_info[0]
-            total_count = len(files_info)
-            
-            print(f"이미지 처리 중: {filename} (총 {total_count}개 중 첫 번째)")
-            
-            # 해당 단지, 유형 워크시트 선택
-            worksheet = self.get_or_create_worksheet(image_info['complex'], pipe_type)
-            
-            # 해당하는 행 찾거나 생성
-            if pipe_type == '횡주':
-                row = self.find_or_create_row(worksheet, pipe_type, image_info['dong'], 
-                                            image_info['ho'], image_info['usage'], 
-                                            image_info['line_detail'])
-            else:
-                row = self.find_or_create_row(worksheet, pipe_type, image_info['dong'], 
-                                            image_info['ho'], image_info['usage'])
-            if not row:
+                    self.process_image_group(*entry[1:], thumbnails)
+                self.advance()
+        finally:
+            media.close()
+    
+    def process_video(self, job, thumbnails):
+        """동영상 하나의 캡처 결과(썸네일 목록)를 해당 행에 삽입"""
+        self.start_file('video', job.path)
+        
+        # 해당 단지, 유형 워크시트에서 행 찾거나 생성
+        worksheet, row = self.locate_row(job)
+        if not row:
+            self.finish_file('video', job.path, '엑셀 행을 찾을 수 없음')
+            return
+        
+        if len(thumbnails) < 3:
+            self.finish_file('video', job.path, '프레임 캡처 실패')
+            return
+        
+        # 이미지를 엑셀에 삽입 (위치사진, 점검사진1, 점검사진2 순서)
+        with self.stats.measure('insert', job.path):
+            cols = self.insert_video_images(worksheet, job.pipe_type, thumbnails, row)
+        self.manifest.record(job.path, worksheet.title, row, cols)
+        self.finish_file('video', job.path)
+        self.after_file_processed()
+    
+    def process_image_group(self, job, total_count, group_key, group_paths, thumbnails):
+        """이미지 그룹의 첫 번째 이미지와 이상유무/위치를 해당 행에 입력"""
+        self.start_file('image', job.path, total_count)
+        
+        # 해당 단지, 유형 워크시트에서 행 찾거나 생성
+        worksheet, row = self.locate_row(job)
+        if not row:
+            self.finish_file('image', job.path, '엑셀 행을 찾을 수 없음')
+            return
+        
+        with self.stats.measure('insert', job.path):
+            cols = self.process_issue_image(worksheet, job, row, thumbnails[0] if thumbnails else None,
+                                            total_count)
+        if cols is None:
+            self.finish_file('image', job.path, '이미지 삽입 실패')
+            return
+        self.manifest.record_group(group_key, group_paths, worksheet.title, row, cols)
+        self.finish_file('image', job.path)
+        self.after_file_processed()
+    
+    def insert_video_images(self, worksheet, pipe_type, thumbnails, row):
+        """동영상 캡처 이미지 삽입 (삽입한 컬럼 목록 반환)"""
+        columns = self.get_columns(worksheet, pipe_type)
+        cols = []
+        # 캡처 순서(시작, 중간, 끝)와 컬럼을 먼저 짝지은 뒤 템플릿에 없는 컬럼은 건너뜀
+        for name, thumbnail in zip(('위치사진', '점검사진1', '점검사진2'), thumbnails):
+            if name not in columns:
                 continue
-            
-            # 컬럼 번호 찾기
-            issue_image_col = self.find_column_by_name(worksheet, '이상배관사진')
-            issue_col = self.find_column_by_name(worksheet, '이상유무')
-            location_col = self.find_column_by_name(worksheet, '위치')
-            
-            # 이미지 삽입
-            if issue_image_col:
-                image_path = os.path.join(folder_path, filename)
-                self.insert_image_to_cell(worksheet, image_path, row, issue_image_col)
-            
-            # 텍스트 정보 입력
-            if issue_col:
-                worksheet.cell(row, issue_col).value = image_info['issue']
-            if location_col:
-                # 위치 정보에 총 개수 추가
-                location_text = f"{image_info['location']}({total_count})" if total_count > 1 else image_info['location']
-                worksheet.cell(row, location_col).value = location_text
-            
-            processed_groups.add(key)
+            self.insert_image_to_cell(worksheet, thumbnail, row, columns[name])
+            cols.append(columns[name])
+        return cols
+    
+    def process_issue_image(self, worksheet, job, row, thumbnail, total_count=1):
+        """이상 이미지와 텍스트 입력 (삽입한 컬럼 목록 반환, 이미지 삽입 실패 시 None)"""
+        # 컬럼 번호 찾기
+        columns = self.get_columns(worksheet, job.pipe_type)
+        issue_image_col = columns.get('이상배관사진')
+        issue_col = columns.get('이상유무')
+        location_col = columns.get('위치')
+        
+        # 이미지 삽입
+        inserted = True
+        if issue_image_col:
+            inserted = thumbnail is not None and self.insert_image_to_cell(worksheet, thumbnail, row, issue_image_col)
+        
+        # 텍스트 정보 입력
+        if issue_col:
+            worksheet.cell(row, issue_col).value = job.issue
+        if location_col:
+            # 위치 정보에 총 개수 추가
+            location_text = f"{job.location}({total_count})" if total_count > 1 else job.location
+            worksheet.cell(row, location_col).value = location_text
+        
+        if not inserted:
+            return None
+        return [issue_image_col] if issue_image_col else []
 
     def save_excel(self, output_file=None):
         """엑셀 파일 저장"""
         if not self.workbook:
-            print("저장할 워크북이 없습니다.")
-            return
+            self.warn("저장할 워크북이 없습니다.")
+            return False
         
         if not output_file:
-            output_file = self.excel_file.replace('.xlsx', '_processed.xlsx')
+            output_file = self.output_file
         
+        # 저장 도중 중단되어도 이전 결과가 남도록 임시 파일에 저장한 뒤 교체
+        temp_file = output_file + '.tmp'
         try:
-            self.workbook.save(output_file)
-            print(f"엑셀 파일 저장 완료: {output_file}")
+            with self.stats.measure('save'):
+                from xlsx_stream_writer import save_workbook
+                media = save_workbook(self.workbook, temp_file, streaming=self.output_backend == 'streaming')
+                os.replace(temp_file, output_file)
+            self.stats.media = media
+            self.log(f"엑셀 파일 저장 완료: {output_file}")
+            if media['placements'] > media['media']:
+                self.log(f"이미지 중복 제거: 삽입 {media['placements']}개 → 저장 {media['media']}개 "
+                         f"({media['duplicate_bytes'] / 1024:.0f}KB 절약)")
         except Exception as e:
-            print(f"엑셀 파일 저장 실패: {e}")
-
-    def cleanup_captured_images(self):
-        """캡처된 이미지 파일들 정리"""
-        capture_dir = os.path.join(os.getcwd(), 'captured_images')
-        if os.path.exists(capture_dir):
+            self.warn(f"엑셀 파일 저장 실패: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return False
+        
+        # 다음 증분 처리를 위해 결과 파일과 함께 매니페스트 저장
+        if output_file == self.output_file:
+            self.manifest.cost_rates = dict(self.cost_model.rates)
             try:
-                shutil.rmtree(capture_dir)
-                print(f"캡처 이미지 폴더 정리 완료: {capture_dir}")
-            except Exception as e:
-                print(f"캡처 이미지 정리 실패: {e}")
+                self.manifest.save()
+            except OSError as e:
+                self.warn(f"매니페스트 저장 실패: {e}")
+        return True
 
+    def close_media_spool(self):
+        """스트리밍 저장용 스풀 파일 닫기 (마지막 저장 뒤에 호출, 이후에는 워크북을 다시 저장할 수 없음)"""
+        if self.media_spool is not None:
+            self.media_spool.close()
+            self.media_spool = None
+
+    def save_report(self):
+        """처리 시간 JSON 보고서 저장 (report_file 지정 시)"""
+        if not self.report_file:
+            return False
+        try:
+            self.stats.save(self.report_file)
+        except OSError as e:
+            self.warn(f"처리 시간 보고서 저장 실패: {e}")
+            return False
+        return True
+    
     def process_all(self):
-        """전체 처리 실행"""
-        if not self.load_excel():
-            return
+        """전체 처리 실행 (단계별 처리 시간 ProcessingStats 반환, 엑셀을 열지 못하면 None)"""
+        self.stats.start()
+        with self.stats.measure('load'):
+            loaded = self.load_excel()
+        if not loaded:
+            return None
+        
+        # 처리 목록을 먼저 만들어 전체 파일 수 계산 (스캔 결과는 처리 단계에서 그대로 재사용)
+        plans = {pipe_type: self.plan_scan(scan) for pipe_type, scan in self.scan_inputs().items()}
+        self.files_total = sum(len(entries) for entries, _ in plans.values())
+        skipped = sum(skipped for _, skipped in plans.values())
+        durations = [entry[1].media_info.duration for entries, _ in plans.values() for entry in entries
+                     if entry[0] == 'video' and entry[1].media_info]
+        if durations:
+            self.log(f"처리할 파일 수: {self.files_total}개 (동영상 길이 합계 {sum(durations) / 60:.1f}분)")
+        else:
+            self.log(f"처리할 파일 수: {self.files_total}개")
+        if skipped:
+            self.log(f"증분 처리: 변경되지 않은 파일/그룹 {skipped}개 건너뜀")
+        self.advance(0)
         
+        # 입상관, 횡주관 순서로 처리 (하위 폴더 포함)
         try:
-            # 입상관 폴더 처리
-            if os.path.exists("입상관"):
-                self.process_folder("입상관", "입상")
-            
-            # 횡주관 폴더 처리
-            if os.path.exists("횡주관"):
-                self.process_folder("횡주관", "횡주")
-            
-            self.save_excel()
-            
+            for pipe_type, (entries, _) in plans.items():
+                if entries and not self.cancelled:
+                    self.log(f"=== {PIPE_FOLDERS[pipe_type]} 파일 처리 시작 ===")
+                    self.process_entries(entries)
+        except Exception:
+            # 오류로 끝나면 결과를 저장하지 않으므로 스풀 파일도 닫음 (Ctrl+C는 호출한 쪽에서 저장한 뒤 닫음)
+            self.close_media_spool()
+            raise
+        
+        self.log(self.capture_summary())
+        if self.cost_model.summary():
+            self.log(self.cost_model.summary())
+        if self.thumbnail_cache:
+            self.log(self.thumbnail_cache.summary())
+        try:
+            self.saved = self.save_checkpoint(complete=not self.cancelled)
         finally:
-            # 작업 완료 후 캡처 이미지 정리
-            self.cleanup_captured_images()
+            # 마지막 저장이 끝나면(실패해도) 스트리밍 저장용 스풀 파일을 닫음
+            self.close_media_spool()
+        
+        # 단계별 처리 시간 요약
+        self.stats.stop()
+        for line in self.stats.summary_lines():
+            self.log(line)
+        if self.save_report():
+            self.log(f"처리 시간 보고서 저장: {self.report_file}")
+        self.emit(EVENT_SUMMARY, data=self.stats.to_dict())
+        return self.stats
 
-def main():
-    # 파일 경로 설정
-    excel_file = "sample.xlsx"
+def run_cli(args, observer=None):
+    """커맨드라인 인자로 처리 실행 (종료 코드 반환, observer는 진행 이벤트를 추가로 받음)"""
+    if not os.path.isfile(args.template):
+        print(f"템플릿 엑셀 파일을 찾을 수 없습니다: {args.template}", file=sys.stderr)
+        return EXIT_INPUT
+    roots = list(args.folders) + list(args.roots or [])
+    missing = [folder for folder in roots if not os.path.isdir(folder)]
+    if missing:
+        print(f"작업 폴더를 찾을 수 없습니다: {', '.join(missing)}", file=sys.stderr)
+        return EXIT_INPUT
     
-    print("=== 동영상/이미지 → 엑셀 처리 시작 ===")
+    try:
+        processor = VideoExcelProcessor(args.template, None, None, workers=args.workers,
+                                        output_backend=args.backend, cache_dir=args.cache_dir,
+                                        cache_max_bytes=args.cache_size_mb * 1024 * 1024,
+                                        incremental=args.incremental, output_file=args.output,
+                                        checkpoint_every=args.checkpoint_every,
+                                        checkpoint_interval=args.checkpoint_minutes * 60,
+                                        roots=roots, include=args.include, exclude=args.exclude,
+                                        report_file=args.report,
+                                        # --quiet이면 파일별 진행 출력 없이 마지막 결과만 출력
+                                        observers=[] if args.quiet else [print_event])
+    except OSError as e:
+        # 캐시 폴더를 만들거나 읽을 수 없는 경우 등
+        print(f"썸네일 캐시 폴더를 사용할 수 없습니다: {args.cache_dir} ({e})", file=sys.stderr)
+        return EXIT_INPUT
+    if observer:
+        processor.add_observer(observer)
     
-    # 처리 실행
-    processor = VideoExcelProcessor(excel_file, None, None)
-    processor.process_all()
+    # 오래 처리한 뒤에 저장이 실패하지 않도록 결과 파일을 쓸 수 있는지 먼저 확인
+    output_dir = os.path.dirname(os.path.abspath(processor.output_file))
+    if not os.path.isdir(output_dir):
+        print(f"결과 파일 폴더를 찾을 수 없습니다: {output_dir}", file=sys.stderr)
+        return EXIT_SAVE
+    if not can_replace(processor.output_file):
+        print(f"결과 파일을 저장할 수 없습니다 (쓰기 권한 없음): {processor.output_file}", file=sys.stderr)
+        return EXIT_SAVE
+    in_use = check_in_use(processor.output_file)
+    if in_use == IN_USE_LOCKED:
+        print(f"결과 파일을 쓸 수 없습니다 ({IN_USE_MESSAGES[in_use]}): {processor.output_file}", file=sys.stderr)
+        return EXIT_SAVE
+    if in_use:
+        print(f"경고: 결과 파일이 열려 있을 수 있습니다 ({IN_USE_MESSAGES[in_use]}): {processor.output_file}",
+              file=sys.stderr)
+    
+    try:
+        stats = processor.process_all()
+    except KeyboardInterrupt:
+        # 처리한 부분까지 저장해 두면 같은 명령으로 다시 실행했을 때 이어서 처리함
+        if processor.workbook:
+            processor.cancelled = True
+            try:
+                processor.save_checkpoint(complete=False)
+            finally:
+                processor.close_media_spool()
+        print("처리가 중단되었습니다. 같은 명령으로 다시 실행하면 이어서 처리합니다.", file=sys.stderr)
+        return EXIT_INTERRUPTED
     
-    print("=== 처리 완료 ===")
+    if stats is None:
+        print(f"템플릿 엑셀 파일을 열 수 없습니다: {args.template}", file=sys.stderr)
+        return EXIT_INPUT
+    if not processor.saved:
+        print(f"결과 파일 저장 실패: {processor.output_file}", file=sys.stderr)
+        return EXIT_SAVE
+    
+    print(f"결과: {processor.output_file} (파일 {len(stats.files)}개, 실패 {len(processor.failures)}개, "
+          f"{stats.wall_time:.1f}초)")
+    if processor.failures:
+        for path, reason in processor.failures:
+            print(f"처리 실패: {path} - {reason}", file=sys.stderr)
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+def build_parser():
+    """커맨드라인 인자 정의 (배치 실행기에서도 작업 설정 검사에 사용)"""
+    parser = argparse.ArgumentParser(
+        description="동영상/이미지 → 엑셀 처리기",
+        epilog=f"종료 코드: {EXIT_OK} 완료, {EXIT_PARTIAL} 일부 파일 실패, {EXIT_USAGE} 잘못된 인자, "
+               f"{EXIT_INPUT} 템플릿/작업 폴더/캐시 폴더 오류, {EXIT_SAVE} 결과 저장 실패, {EXIT_INTERRUPTED} 중단됨")
+    parser.add_argument('folders', nargs='*',
+                        help="작업 폴더 (입상관/횡주관 폴더가 있는 폴더, 여러 개 지정 가능, "
+                             "기본값: 현재 폴더의 입상관, 횡주관)")
+    parser.add_argument('-t', '--template', default='sample.xlsx',
+                        help="입상sample/횡주sample 시트가 있는 템플릿 엑셀 (기본값: sample.xlsx)")
+    parser.add_argument('-o', '--output',
+                        help="결과 엑셀 경로 (기본값: 템플릿 옆 *_processed.xlsx)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="동영상 프레임 캡처에 사용할 프로세스 수 (기본값: 1)")
+    parser.add_argument('--backend', choices=OUTPUT_BACKENDS, default='openpyxl',
+                        help="엑셀 저장 방식 (streaming: 이미지가 많은 경우 메모리 사용을 일정하게 유지)")
+    parser.add_argument('--cache-dir',
+                        help="썸네일 캐시 폴더 (지정하면 변경되지 않은 파일은 다시 디코딩하지 않음)")
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="썸네일 캐시 최대 크기 (MB)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="이전 결과 파일(_processed.xlsx)에 새로 추가되었거나 변경된 파일만 반영")
+    parser.add_argument('--checkpoint-every', type=int, default=0,
+                        help="파일 N개를 처리할 때마다 결과를 중간 저장 (중단 후 다시 실행하면 이어서 처리)")
+    parser.add_argument('--checkpoint-minutes', type=float, default=0,
+                        help="N분마다 결과를 중간 저장")
+    parser.add_argument('--root', action='append', dest='roots',
+                        help="입력 폴더 (여러 번 지정 가능, 하위 폴더까지 처리, 기본값: 입상관, 횡주관)")
+    parser.add_argument('--include', action='append',
+                        help="처리할 파일 패턴 (예: '*/2024-06-*/*', 여러 번 지정 가능)")
+    parser.add_argument('--exclude', action='append',
+                        help="제외할 파일/폴더 패턴 (예: '*백업*', 여러 번 지정 가능)")
+    parser.add_argument('--report',
+                        help="단계별 처리 시간과 가장 오래 걸린 파일을 기록할 JSON 보고서 경로")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="파일별 진행 출력 생략 (결과와 오류만 출력)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return run_cli(args)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
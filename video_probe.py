@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동영상 정보 확인 (디코더를 열지 않고 MP4 moov 헤더만 읽음)
+
+- 길이/fps/프레임 수/해상도/코덱/키프레임 간격을 moov 박스(mvhd, mdhd, hdlr, stsd, stts, stss, stsz)에서 읽음
+  (mdat는 건너뛰므로 파일 크기와 관계없이 헤더 몇 KB만 읽음)
+- moov가 없거나(녹화가 비정상 종료된 파일) 박스 구조가 깨진 파일은 ProbeError로 알려 작업자에 넘기기 전에 제외
+- 조각난 MP4(fragmented)처럼 헤더만으로 알 수 없는 파일, 첫 박스가 ISO-BMFF 박스가 아닌 파일(확장자만 .mp4인
+  AVI 등), 읽을 수 없는 파일은 None을 반환하고 디코더(OpenCV)가 판단
+- 결과는 (경로, 크기, 수정 시각) 기준으로 프로세스 안에 보관 (GUI에서 다시 처리할 때 재사용)
+"""
+
+import os
+import struct
+from collections import OrderedDict
+
+# moov 박스 최대 크기 (이보다 크면 손상된 파일로 봄, 몇 시간짜리 영상도 수 MB 이내)
+MAX_MOOV_BYTES = 64 * 1024 * 1024
+
+# 최상위 박스 크기 상한 (헤더 해석용)
+MAX_BOX_END = 1 << 62
+
+# 보관할 확인 결과 수
+PROBE_CACHE_SIZE = 4096
+
+# 하위 박스를 가지는 컨테이너 박스 (moov 안에서 찾아 들어가는 것만)
+CONTAINER_BOXES = (b'moov', b'trak', b'mdia', b'minf', b'stbl')
+
+# 파일 맨 앞에 올 수 있는 최상위 박스 (이 중 하나로 시작해야 ISO-BMFF(MP4/MOV) 파일로 보고 구조를 검사)
+FILE_START_BOXES = (b'ftyp', b'styp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot', b'uuid', b'pdin',
+                    b'meta', b'sidx')
+
+class ProbeError(ValueError):
+    """동영상 파일이 손상되어 처리할 수 없음 (메시지는 실패 사유)"""
+
+class VideoInfo:
+    """컨테이너 헤더에서 읽은 동영상 정보 (작업자 프로세스에 그대로 전달됨)"""
+    __slots__ = ('duration', 'fps', 'frame_count', 'width', 'height', 'codec', 'gop_frames')
+
+    def __init__(self, duration, fps, frame_count, width, height, codec, gop_frames):
+        self.duration = duration        # 초
+        self.fps = fps
+        self.frame_count = frame_count
+        self.width = width
+        self.height = height
+        self.codec = codec              # 'avc1', 'hvc1' 등 stsd 형식 이름
+        self.gop_frames = gop_frames    # 평균 키프레임 간격 (프레임 수, 모든 프레임이 키프레임이면 1)
+
+    @property
+    def resolution(self):
+        return (self.width, self.height)
+
+    def __repr__(self):
+        return (f"VideoInfo({self.codec} {self.width}x{self.height}, {self.duration:.2f}초, "
+                f"{self.fps:.2f}fps, {self.frame_count}프레임, GOP {self.gop_frames})")
+
+_probe_cache = OrderedDict()  # {(경로, 크기, 수정 시각): VideoInfo, None 또는 ProbeError}
+
+def read_box_header(data, offset, end):
+    """박스 헤더 (종류, 내용 시작, 박스 끝) (end: 상위 박스 끝)"""
+    if end - offset < 8:
+        raise ProbeError("MP4 박스 구조 손상")
+    size, box_type = struct.unpack_from('>I4s', data, offset)
+    header = 8
+    if size == 1:
+        if end - offset < 16:
+            raise ProbeError("MP4 박스 구조 손상")
+        size, = struct.unpack_from('>Q', data, offset + 8)
+        header = 16
+    elif size == 0:
+        size = end - offset
+    if size < header or offset + size > end:
+        raise ProbeError("MP4 박스 구조 손상")
+    return box_type, offset + header, offset + size
+
+def iter_boxes(data, start, end):
+    """start~end 사이 박스 목록 [(종류, 내용 시작, 박스 끝)]"""
+    offset = start
+    while offset < end:
+        box_type, body, box_end = read_box_header(data, offset, end)
+        yield box_type, body, box_end
+        offset = box_end
+
+def find_moov(path):
+    """최상위 박스를 훑어 moov 박스 내용을 읽음 (mdat 등은 건너뜀, ISO-BMFF 파일이 아니면 None)"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        offset = 0
+        while offset < file_size:
+            f.seek(offset)
+            header = f.read(16).ljust(16, b'\0')
+            if offset == 0 and header[4:8] not in FILE_START_BOXES:
+                # 다른 형식(AVI 등)은 디코더가 열 수 있는지 판단
+                return None
+            remaining = file_size - offset
+            # 크기 0은 파일 끝까지인 박스, 나머지는 크기를 그대로 읽어 파일보다 긴지 확인
+            box_type, body, box_end = read_box_header(header, 0,
+                                                      remaining if header[:4] == bytes(4) else MAX_BOX_END)
+            if not all(32 <= c < 127 for c in box_type):
+                raise ProbeError("MP4 박스 구조 손상")
+            if box_end > remaining and box_type != b'moov':
+                # 녹화 도중 끊긴 파일은 mdat가 잘리고 그 뒤에 올 moov가 없음
+                raise ProbeError("파일이 잘림 (녹화가 비정상 종료된 파일)")
+            if box_type == b'moov':
+                if box_end > remaining:
+                    raise ProbeError("MP4 헤더(moov)가 잘림")
+                if box_end > MAX_MOOV_BYTES:
+                    raise ProbeError("MP4 헤더 손상 (moov 크기 비정상)")
+                f.seek(offset)
+                data = f.read(box_end)
+                return data, body
+            offset += box_end
+    raise ProbeError("MP4 헤더(moov) 없음 (녹화가 비정상 종료된 파일)")
+
+def parse_media_header(data, body):
+    """mvhd/mdhd 박스의 (timescale, duration)"""
+    version = data[body]
+    if version == 1:
+        return struct.unpack_from('>IQ', data, body + 20)
+    return struct.unpack_from('>II', data, body + 12)
+
+def parse_track(data, start, end, track):
+    """trak 박스 아래에서 필요한 값만 track(dict)에 모음"""
+    for box_type, body, box_end in iter_boxes(data, start, end):
+        if box_type in CONTAINER_BOXES:
+            parse_track(data, body, box_end, track)
+        elif box_type == b'mdhd':
+            track['timescale'], track['duration'] = parse_media_header(data, body)
+        elif box_type == b'hdlr':
+            track['handler'] = data[body + 8:body + 12]
+        elif box_type == b'stsd':
+            # 첫 번째 샘플 설명: 크기(4) 형식(4) 예약(6) 참조(2) ... 너비(2) 높이(2)
+            entry = body + 8
+            if box_end - entry >= 36:
+                track['codec'] = data[entry + 4:entry + 8].decode('latin-1')
+                track['width'], track['height'] = struct.unpack_from('>HH', data, entry + 32)
+        elif box_type == b'stts':
+            count, = struct.unpack_from('>I', data, body + 4)
+            if body + 8 + count * 8 > box_end:
+                raise ProbeError("MP4 헤더 손상 (stts)")
+            track['stts'] = [struct.unpack_from('>II', data, body + 8 + i * 8) for i in range(count)]
+        elif box_type == b'stss':
+            track['sync_count'], = struct.unpack_from('>I', data, body + 4)
+        elif box_type == b'stsz':
+            track['sample_count'], = struct.unpack_from('>I', data, body + 8)
+
+def probe_mp4(path):
+    """MP4 헤더에서 동영상 정보 읽기 (헤더로 알 수 없으면 None, 손상된 파일이면 ProbeError)"""
+    try:
+        found = find_moov(path)
+        if found is None:
+            return None
+        data, body = found
+        movie = {}
+        video = None
+        fragmented = False
+        for box_type, box_body, box_end in iter_boxes(data, body, len(data)):
+            if box_type == b'mvhd':
+                movie['timescale'], movie['duration'] = parse_media_header(data, box_body)
+            elif box_type == b'mvex':
+                fragmented = True
+            elif box_type == b'trak':
+                track = {}
+                parse_track(data, box_body, box_end, track)
+                if track.get('handler') == b'vide' and video is None:
+                    video = track
+    except struct.error:
+        raise ProbeError("MP4 헤더 손상")
+    if video is None:
+        raise ProbeError("영상 트랙 없음")
+
+    frame_count = video.get('sample_count') or sum(count for count, _ in video.get('stts', ()))
+    if not frame_count:
+        if fragmented:
+            # 조각난 MP4는 샘플 정보가 moof에 있음 (디코더 값 사용)
+            return None
+        raise ProbeError("영상 프레임 없음")
+    timescale = video.get('timescale') or movie.get('timescale')
+    duration = video.get('duration') if video.get('timescale') else movie.get('duration')
+    if not timescale or not duration:
+        return None
+    duration = duration / timescale
+    stts = video.get('stts', ())
+    if len(stts) == 1 and stts[0][1]:
+        # 고정 프레임 레이트: 샘플 간격으로 정확한 값 계산
+        fps = timescale / stts[0][1]
+    else:
+        fps = frame_count / duration
+    sync_count = video.get('sync_count')
+    gop_frames = max(1, round(frame_count / sync_count)) if sync_count else 1  # stss가 없으면 모두 키프레임
+    return VideoInfo(duration, fps, frame_count, video.get('width', 0), video.get('height', 0),
+                     video.get('codec'), gop_frames)
+
+def probe_video(path, stat=None):
+    """동영상 정보 (보관된 결과가 있으면 재사용, 헤더로 알 수 없으면 None, 손상된 파일이면 ProbeError)"""
+    try:
+        stat = stat or os.stat(path)
+    except OSError:
+        # 스캔 뒤에 지워진 파일 등은 디코더가 열 때 실패 사유를 남김
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key in _probe_cache:
+        _probe_cache.move_to_end(key)
+        result = _probe_cache[key]
+    else:
+        try:
+            result = probe_mp4(path)
+        except ProbeError as e:
+            result = e
+        except OSError:
+            # 읽을 수 없는 파일은 디코더가 열 때 실패 사유를 남김
+            result = None
+        _probe_cache[key] = result
+        if len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    if isinstance(result, ProbeError):
+        raise result
+    return result
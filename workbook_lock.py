@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+엑셀 파일 사용 중 확인 (Windows/macOS/Linux 공통)
+
+- 쓰기 모드로 열어 보기: Windows의 Excel/WPS는 연 파일을 다른 프로그램이 쓰지 못하게 잠그므로
+  실패하면 확실히 사용 중 (파일 내용은 바꾸지 않음, 읽기 전용 파일은 잠금으로 보지 않음)
+  저장할 파일에만 사용하고, 읽기만 하는 템플릿은 잠금 파일/창 제목으로만 확인
+- Office/WPS(~$이름.xlsx), LibreOffice(.~lock.이름.xlsx#) 잠금 파일: 네트워크 드라이브처럼
+  잠금이 보이지 않는 곳에서도 알 수 있지만, 프로그램이 비정상 종료되면 남아 있을 수 있음
+- 창 제목 검색(Windows, psutil/pywin32 필요)은 선택 사항 (창을 한 번만 훑음)
+모두 파일 몇 개만 확인하므로 수 밀리초 안에 끝남
+"""
+
+import os
+import sys
+
+# 확인 결과 (사용 중이 아니면 None)
+IN_USE_LOCKED = 'locked'        # 다른 프로그램이 파일을 잠그고 있음 (저장 불가)
+IN_USE_LOCK_FILE = 'lock_file'  # 잠금 파일이 있음 (열려 있거나 비정상 종료 후 남은 파일)
+IN_USE_WINDOW = 'window'        # 엑셀 창 제목에 파일 이름이 있음
+
+IN_USE_MESSAGES = {
+    IN_USE_LOCKED: '다른 프로그램이 사용 중',
+    IN_USE_LOCK_FILE: '잠금 파일 있음',
+    IN_USE_WINDOW: '엑셀 창에서 열려 있음',
+}
+
+# 창 제목으로 찾을 엑셀 프로그램 (MS Excel, WPS Office)
+EXCEL_PROCESSES = ('excel.exe', 'et.exe')
+
+def lock_file_paths(path):
+    """파일을 열었을 때 엑셀 프로그램들이 만드는 잠금 파일 경로"""
+    directory, name = os.path.split(os.path.abspath(path))
+    return [os.path.join(directory, '~$' + name),
+            os.path.join(directory, f'.~lock.{name}#')]
+
+def is_locked(path):
+    """다른 프로그램이 잠가서 쓰기 모드로 열 수 없는지 (없는 파일, 읽기 전용 파일이면 False)"""
+    try:
+        with open(path, 'r+b'):
+            return False
+    except FileNotFoundError:
+        return False
+    except PermissionError:
+        # 읽기 전용 속성/권한 때문이면 잠금이 아님 (저장 가능 여부는 can_replace로 확인)
+        return os.access(path, os.W_OK)
+    except OSError:
+        return False
+
+def can_replace(path):
+    """임시 파일에 저장한 뒤 교체(os.replace)하는 방식으로 path에 저장할 수 있는지
+
+    POSIX에서는 폴더에 쓸 수 있으면 읽기 전용 파일도 교체되지만, Windows에서는 읽기 전용 파일을 교체할 수 없음
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.access(directory, os.W_OK | os.X_OK):
+        return False
+    if sys.platform == 'win32' and os.path.exists(path):
+        return os.access(path, os.W_OK)
+    return True
+
+def excel_window_titles():
+    """엑셀 프로그램 창 제목 목록 (Windows 이외이거나 psutil/pywin32가 없으면 빈 목록)"""
+    if sys.platform != 'win32':
+        return []
+    try:
+        import psutil
+        import win32gui
+        import win32process
+    except ImportError:
+        return []
+
+    excel_pids = set()
+    for proc in psutil.process_iter(['pid', 'name']):
+        if (proc.info['name'] or '').lower() in EXCEL_PROCESSES:
+            excel_pids.add(proc.info['pid'])
+    if not excel_pids:
+        return []
+
+    titles = []
+    def enum_windows_callback(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd):
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            if pid in excel_pids:
+                titles.append(win32gui.GetWindowText(hwnd))
+        return True
+    win32gui.EnumWindows(enum_windows_callback, None)
+    return titles
+
+def check_in_use(path, write=True):
+    """파일 사용 중 여부 (IN_USE_LOCKED/IN_USE_LOCK_FILE, 사용 중이 아니면 None)
+    write가 False면 (읽기만 하는 파일) 쓰기 모드로 열어 보지 않고 잠금 파일만 확인"""
+    if write and is_locked(path):
+        return IN_USE_LOCKED
+    if any(os.path.exists(lock_path) for lock_path in lock_file_paths(path)):
+        return IN_USE_LOCK_FILE
+    return None
+
+def find_in_use(paths, window_scan=False, read_only=()):
+    """사용 중인 파일 목록 [(경로, IN_USE_* 값)] (window_scan이면 다른 방법으로 모르는 파일만 창 제목 확인)
+    read_only: paths 중 읽기만 하는 파일 (템플릿 등, 쓰기 모드 확인 제외)"""
+    result = []
+    unknown = []
+    for path in paths:
+        reason = check_in_use(path, write=path not in read_only)
+        if reason:
+            result.append((path, reason))
+        else:
+            unknown.append(path)
+    if window_scan and unknown:
+        try:
+            window_titles = excel_window_titles()
+        except Exception:
+            # 창 목록을 읽지 못해도 다른 확인 결과는 사용
+            window_titles = []
+        for path in unknown:
+            filename = os.path.basename(path).lower()
+            if any(filename in title.lower() for title in window_titles):
+                result.append((path, IN_USE_WINDOW))
+    return result
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이미지가 많은 워크북을 위한 스트리밍 xlsx 저장 백엔드
+
+- 썸네일 JPEG는 만들어지는 즉시 임시 스풀 파일에 기록하고, 워크북에는 위치(offset)만 보관
+- 저장 시 미디어를 하나씩 읽어 xlsx 패키지에 바로 기록 (이미 압축된 JPEG/PNG는 재압축하지 않음)
+- 셀 값과 서식은 openpyxl 워크북 그대로 사용하므로 입상sample/횡주sample 양식 서식이 유지됨
+- 내용이 같은 이미지(다시 올린 사진, 정지 화면 프레임 등)는 해시로 찾아 패키지에 한 번만 저장하고
+  여러 드로잉이 같은 미디어 파일을 참조함 (두 저장 방식 모두 DedupExcelWriter 사용)
+- 엑셀 이미지 클래스(ThumbnailImage, SpooledImage)도 여기에 둠 (openpyxl은 이 모듈을 불러올 때 로드)
+"""
+
+import datetime
+import hashlib
+import os
+import tempfile
+import threading
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+from openpyxl.drawing.image import Image as OpenpyxlImage
+from openpyxl.packaging.relationship import get_rels_path
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.xml.functions import tostring
+
+# 재압축해도 크기가 거의 줄지 않는 미디어 형식
+STORED_MEDIA_FORMATS = ('jpeg', 'png', 'gif')
+
+def media_digest(data):
+    """이미지 바이트의 내용 해시 (같은 이미지를 한 번만 저장하는 데 사용)"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class MediaSpool:
+    """썸네일 바이트를 메모리 대신 임시 파일에 순차 기록하는 저장소"""
+
+    def __init__(self, directory=None):
+        self.file = tempfile.TemporaryFile(prefix='xlsx_media_', dir=directory)
+        self.lock = threading.Lock()
+        self.size = 0
+        self.count = 0
+        self.refs = {}  # {내용 해시: (offset, length)} 같은 내용은 한 번만 기록
+
+    def add(self, data, digest=None):
+        """바이트를 스풀에 추가하고 (offset, length) 반환 (이미 있는 내용이면 기존 위치)"""
+        digest = digest or media_digest(data)
+        with self.lock:
+            if digest in self.refs:
+                return self.refs[digest]
+            offset = self.size
+            self.file.seek(offset)
+            self.file.write(data)
+            self.size += len(data)
+            self.count += 1
+            self.refs[digest] = (offset, len(data))
+        return offset, len(data)
+
+    def read(self, offset, length):
+        """스풀에서 바이트 읽기"""
+        with self.lock:
+            self.file.seek(offset)
+            return self.file.read(length)
+
+    def close(self):
+        """스풀 파일 닫기 (임시 파일은 자동 삭제됨)"""
+        self.file.close()
+
+class ThumbnailImage(OpenpyxlImage):
+    """메모리의 JPEG 바이트를 그대로 담는 엑셀 이미지 (임시 파일 없이 여러 번 저장 가능)"""
+
+    def __init__(self, data, width, height, image_format='jpeg', digest=None):
+        # 부모 생성자는 PIL로 이미지를 다시 열기 때문에 호출하지 않음
+        self.ref = data
+        self.width = width
+        self.height = height
+        self.format = image_format
+        self.digest = digest or media_digest(data)
+
+    def _data(self):
+        return self.ref
+
+class SpooledImage(OpenpyxlImage):
+    """데이터를 MediaSpool에 두고 저장할 때만 읽어오는 엑셀 이미지"""
+
+    def __init__(self, spool, data, width, height, image_format='jpeg', digest=None):
+        # 부모 생성자는 PIL로 이미지를 열기 때문에 호출하지 않음
+        self.digest = digest or media_digest(data)
+        self.spool = spool
+        self.ref = spool.add(data, self.digest)
+        self.width = width
+        self.height = height
+        self.format = image_format
+
+    def _data(self):
+        return self.spool.read(*self.ref)
+
+class DedupExcelWriter(ExcelWriter):
+    """내용이 같은 이미지를 미디어 파일 하나로 저장하는 ExcelWriter (드로잉 관계는 같은 파일을 가리킴)"""
+
+    def __init__(self, workbook, archive):
+        super().__init__(workbook, archive)
+        self.media_ids = {}  # {(내용 해시, 형식): 미디어 번호}
+        self.placements = 0  # 드로잉에 놓인 이미지 수
+        self.duplicate_bytes = 0  # 중복 제거로 저장하지 않은 바이트
+
+    def _write_drawing(self, drawing):
+        # ExcelWriter._write_drawing과 같지만, 이미 저장한 내용의 이미지는 그 미디어 번호를 같이 씀
+        self._drawings.append(drawing)
+        drawing._id = len(self._drawings)
+        for chart in drawing.charts:
+            self._charts.append(chart)
+            chart._id = len(self._charts)
+        for img in drawing.images:
+            self.placements += 1
+            digest = getattr(img, 'digest', None)
+            key = (digest, img.format) if digest else None
+            if key in self.media_ids:
+                img._id = self.media_ids[key]
+                self.duplicate_bytes += img.ref[1] if isinstance(img, SpooledImage) else len(img._data())
+                continue
+            self._images.append(img)
+            img._id = len(self._images)
+            if key:
+                self.media_ids[key] = img._id
+        rels_path = get_rels_path(drawing.path)[1:]
+        self._archive.writestr(drawing.path[1:], tostring(drawing._write()))
+        self._archive.writestr(rels_path, tostring(drawing._write_rels()))
+        self.manifest.append(drawing)
+
+    def media_stats(self):
+        """중복 제거 통계 {'placements': 놓인 이미지 수, 'media': 저장한 미디어 파일 수, 'duplicate_bytes'}"""
+        return {'placements': self.placements, 'media': len(self._images),
+                'duplicate_bytes': self.duplicate_bytes}
+
+class StreamingExcelWriter(DedupExcelWriter):
+    """미디어를 하나씩 기록하고 이미 압축된 이미지는 무압축(STORED)으로 넣는 ExcelWriter"""
+
+    def _write_images(self):
+        date_time = datetime.datetime.now().timetuple()[:6]
+        for img in self._images:
+            info = ZipInfo(img.path[1:], date_time)
+            info.compress_type = ZIP_STORED if img.format in STORED_MEDIA_FORMATS else ZIP_DEFLATED
+            self._archive.writestr(info, img._data())
+
+def save_workbook(workbook, filename, streaming=False):
+    """워크북 저장 (streaming이면 스트리밍 백엔드), 중복 제거 통계 반환 (DedupExcelWriter.media_stats)"""
+    archive = ZipFile(filename, 'w', ZIP_DEFLATED, allowZip64=True)
+    workbook.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    writer = (StreamingExcelWriter if streaming else DedupExcelWriter)(workbook, archive)
+    try:
+        writer.save()
+    except Exception:
+        archive.close()
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+    return writer.media_stats()